@@ -5,14 +5,31 @@ Handles all external API interactions with caching and error handling
 
 import aiohttp
 import asyncio
-from typing import Optional, Dict, Any, Tuple
-from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Tuple, Callable, Awaitable, List
+from collections import defaultdict
+from datetime import datetime
 import logging
-import hashlib
 import json
+from urllib.parse import urlparse
+
+from utils.cache import LRUCache, NEVER_EXPIRE
+from utils.disk_cache import DiskCache
+from utils.clan_index import ClanIndex
+from utils.models import PlayerSnapshot, normalize_uid
+from utils import json_codec
+from utils.image_pipeline import ImageProcessor
+from utils.resilience import (
+    TokenBucket, CircuitBreaker, CircuitOpenError, RateLimitedError, parse_retry_after, backoff_delay
+)
 
 logger = logging.getLogger(__name__)
 
+PLAYER_NOT_FOUND = "Player not found"
+STALE_DATA_NOTICE = "Upstream API unavailable, showing last known data"
+
+# Structured cache key: (endpoint, *params), e.g. ("player_info", "123456789")
+CacheKey = Tuple[str, ...]
+
 class FFAPIClient:
     """Advanced Free Fire API Client with caching and rate limiting"""
     
@@ -21,6 +38,49 @@ class FFAPIClient:
     OUTFIT_API_URL = "https://ffoutfitapis.vercel.app/outfit-image?uid={uid}&region={region}&key=99day"
     ITEM_ICON_URL = "https://dl.cdn.freefireofficial.com/icons/{item_id}.png"
     
+    # Cache TTL policy per endpoint, in seconds
+    CACHE_TTLS = {
+        "player_info": 300,         # 5 minutes
+        "outfit_image": 600,        # 10 minutes
+        "item_icon": NEVER_EXPIRE,  # static CDN assets
+        "item_grid": NEVER_EXPIRE   # composed from static icons
+    }
+    
+    # Cached in place of an icon the CDN does not have, re-checked after 10 minutes
+    MISSING_ICON = b""
+    MISSING_ICON_TTL = 600
+    
+    # Endpoints whose cache keys are (endpoint, uid, ...) and can be invalidated per UID
+    UID_ENDPOINTS = ("player_info", "outfit_image")
+    
+    # Token-bucket limits per upstream host: (requests per second, burst)
+    RATE_LIMITS = {
+        "danger-info-alpha.vercel.app": (5, 10),
+        "ffoutfitapis.vercel.app": (3, 6),
+        "dl.cdn.freefireofficial.com": (20, 40)
+    }
+    DEFAULT_RATE_LIMIT = (5, 10)
+    
+    # Per-attempt timeouts per endpoint, split so a dead host fails on connect
+    # instead of eating the whole budget
+    TIMEOUTS = {
+        "player_info": aiohttp.ClientTimeout(total=15, sock_connect=5, sock_read=10),
+        "outfit_image": aiohttp.ClientTimeout(total=20, sock_connect=5, sock_read=15),
+        "item_icon": aiohttp.ClientTimeout(total=10, sock_connect=3, sock_read=7)
+    }
+    
+    # Connection pool settings for the client-owned session
+    CONNECTOR_OPTIONS = {
+        "limit": 100,               # total simultaneous connections
+        "limit_per_host": 20,       # per upstream host
+        "ttl_dns_cache": 300,       # seconds
+        "keepalive_timeout": 60,    # keep idle TLS connections for reuse
+        "enable_cleanup_closed": True
+    }
+    
+    # Upstream responses worth retrying
+    RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+    
     # Regions
     REGIONS = {
         "IND": "India",
@@ -37,84 +97,452 @@ class FFAPIClient:
         "ID": "Indonesia"
     }
     
-    def __init__(self, session: aiohttp.ClientSession):
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        max_cache_entries: int = 2048,
+        max_cache_bytes: int = 64 * 1024 * 1024,
+        cache_ttls: Optional[Dict[str, float]] = None,
+        stale_while_revalidate: float = 0,
+        stale_if_error: float = 0,
+        disk_cache: Optional[DiskCache] = None,
+        max_retries: int = 2,
+        max_retry_after: float = 10,
+        breaker_failure_threshold: int = 5,
+        breaker_recovery_timeout: float = 30,
+        image_processor: Optional[ImageProcessor] = None
+    ):
+        # Without a session the client builds and owns a tuned one on first use
         self.session = session
-        self.cache = {}
+        self._owns_session = session is None
+        if session is not None:
+            self._validate_session(session)
+        # Extra seconds past the TTL during which player info may be served stale
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
         self.cache_ttl = 300  # 5 minutes default
-        self.rate_limits = {}
+        self.cache_ttls = {**self.CACHE_TTLS, **(cache_ttls or {})}
+        self.cache = LRUCache(
+            max_entries=max_cache_entries,
+            max_bytes=max_cache_bytes,
+            default_ttl=self.cache_ttl,
+            tagger=self._cache_tags
+        )
+        # Optional persistent tier behind the in-memory cache
+        self.disk_cache = disk_cache
+        self._background_tasks = set()
+        self.rate_limits: Dict[str, TokenBucket] = {}
+        self.max_retries = max_retries
+        # Longest Retry-After we will wait out instead of failing
+        self.max_retry_after = max_retry_after
+        self.retries = 0
+        
+        # Circuit breakers per endpoint, e.g. "player_info"
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_recovery_timeout = breaker_recovery_timeout
+        self.consumer_stats = defaultdict(lambda: {"hits": 0, "misses": 0})
         
-    def _get_cache_key(self, *args) -> str:
-        """Generate cache key from arguments"""
-        key_string = "_".join(str(arg) for arg in args)
-        return hashlib.md5(key_string.encode()).hexdigest()
+        # Optional downsizing/re-encoding of outfit images before they are cached
+        self.image_processor = image_processor
+        
+        # Guilds and their known members, from every player payload seen
+        self.clans = ClanIndex()
+        
+        # Callbacks run with (uid, snapshot) after every successful upstream player fetch
+        self._fetch_listeners: List[Callable[[str, PlayerSnapshot], Any]] = []
+        
+        # In-flight upstream requests, keyed by cache key
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+        self.coalesced_requests = 0
+        self.stale_served = 0
+        self.stale_on_error = 0
+    
+    def for_consumer(self, name: str) -> "ScopedAPIClient":
+        """Get a view of this client that attributes cache usage to `name`"""
+        return ScopedAPIClient(self, name)
     
-    def _is_cache_valid(self, cache_key: str) -> bool:
-        """Check if cached data is still valid"""
-        if cache_key not in self.cache:
-            return False
+    def add_fetch_listener(self, listener: Callable[[str, PlayerSnapshot], Any]):
+        """
+        Register a callback for fresh player snapshots
         
-        cached_data = self.cache[cache_key]
-        if datetime.utcnow() - cached_data['timestamp'] > timedelta(seconds=self.cache_ttl):
-            del self.cache[cache_key]
-            return False
+        Called as listener(uid, snapshot) after each successful upstream fetch;
+        coroutine results run as background tasks.
+        """
+        self._fetch_listeners.append(listener)
+    
+    def remove_fetch_listener(self, listener: Callable[[str, PlayerSnapshot], Any]):
+        """Unregister a fetch listener"""
+        if listener in self._fetch_listeners:
+            self._fetch_listeners.remove(listener)
+    
+    def _notify_fetch(self, uid: str, data: PlayerSnapshot):
+        """Hand a freshly fetched player snapshot to the listeners"""
+        for listener in self._fetch_listeners:
+            try:
+                result = listener(uid, data)
+                if asyncio.iscoroutine(result):
+                    self._spawn(result)
+            except Exception as e:
+                logger.error(f"Error in fetch listener: {e}")
+    
+    def _record_lookup(self, consumer: Optional[str], hit: bool):
+        """Record a cache hit/miss for the calling cog"""
+        stats = self.consumer_stats[consumer or "unknown"]
+        stats["hits" if hit else "misses"] += 1
         
-        return True
+    def _get_cache_key(self, endpoint: str, *args) -> CacheKey:
+        """Generate a structured cache key: (endpoint, *args)"""
+        return (endpoint,) + tuple(str(arg) for arg in args)
     
-    def _get_from_cache(self, cache_key: str) -> Optional[Any]:
+    @classmethod
+    def _cache_tags(cls, cache_key: CacheKey) -> List[Tuple[str, str]]:
+        """Index tags for a cache key, used for endpoint and per-UID invalidation"""
+        tags = [("endpoint", cache_key[0])]
+        if cache_key[0] in cls.UID_ENDPOINTS and len(cache_key) > 1:
+            tags.append(("uid", cache_key[1]))
+        return tags
+    
+    def _get_from_cache(self, cache_key: CacheKey) -> Optional[Any]:
         """Get data from cache if valid"""
-        if self._is_cache_valid(cache_key):
-            return self.cache[cache_key]['data']
-        return None
-    
-    def _add_to_cache(self, cache_key: str, data: Any, ttl: Optional[int] = None):
-        """Add data to cache"""
-        self.cache[cache_key] = {
-            'data': data,
-            'timestamp': datetime.utcnow(),
-            'ttl': ttl or self.cache_ttl
-        }
+        return self.cache.get(cache_key)
+    
+    def _get_ttl(self, endpoint: str) -> float:
+        """Get the cache TTL policy for an endpoint"""
+        return self.cache_ttls.get(endpoint, self.cache_ttl)
+    
+    def _add_to_cache(
+        self,
+        cache_key: CacheKey,
+        data: Any,
+        ttl: Optional[float] = None,
+        grace: float = 0,
+        persist: bool = True
+    ):
+        """Add data to cache with its own TTL (defaults to cache_ttl), writing through to disk"""
+        ttl = self.cache_ttl if ttl is None else ttl
+        self.cache.set(cache_key, data, ttl=ttl, grace=grace)
+        if persist and self.disk_cache is not None:
+            if isinstance(data, PlayerSnapshot):
+                data = data.to_payload()
+            self._spawn(self.disk_cache.set(self._disk_key(cache_key), data, ttl))
+    
+    def _disk_key(self, cache_key: CacheKey) -> str:
+        """Get the string key used for the disk tier, e.g. player_info:123456789"""
+        return ":".join(cache_key)
+    
+    def _spawn(self, coro: Awaitable[Any]) -> asyncio.Task:
+        """Run a coroutine in the background, keeping a reference until it finishes"""
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+    
+    async def _fetch_through_disk(self, cache_key: CacheKey, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Try the disk tier before going upstream, promoting hits into memory"""
+        if self.disk_cache is not None:
+            disk_hit = await self.disk_cache.get(self._disk_key(cache_key))
+            if disk_hit is not None:
+                data, ttl = disk_hit
+                grace = 0
+                if cache_key[0] == "player_info":
+                    data = PlayerSnapshot.from_payload(cache_key[1], data)
+                    self.clans.record(cache_key[1], data)
+                    # Same stale window as a fresh upstream fetch
+                    grace = max(self.stale_while_revalidate, self.stale_if_error)
+                self._add_to_cache(cache_key, data, ttl=ttl, grace=grace, persist=False)
+                return True, data, None
+        return await fetch()
+    
+    async def _coalesce(self, cache_key: CacheKey, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run at most one upstream fetch per cache key at a time
+        
+        Concurrent callers for the same key await the request already in flight
+        instead of issuing their own.
+        """
+        if cache_key in self._inflight:
+            self.coalesced_requests += 1
+        future = self._start_fetch(cache_key, lambda: self._fetch_through_disk(cache_key, fetch))
+        # Shield so one caller giving up does not cancel the fetch for the others
+        return await asyncio.shield(future)
+    
+    def _start_fetch(self, cache_key: CacheKey, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """Get the in-flight fetch for a cache key, starting one if needed"""
+        future = self._inflight.get(cache_key)
+        if future is None:
+            future = asyncio.ensure_future(fetch())
+            self._inflight[cache_key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        return future
+    
+    def _get_rate_limiter(self, url: str) -> TokenBucket:
+        """Get the token bucket for a URL's host"""
+        host = urlparse(url).hostname or ""
+        limiter = self.rate_limits.get(host)
+        if limiter is None:
+            rate, burst = self.RATE_LIMITS.get(host, self.DEFAULT_RATE_LIMIT)
+            limiter = TokenBucket(rate, burst)
+            self.rate_limits[host] = limiter
+        return limiter
     
-    async def get_player_info(self, uid: str, region: str = "IND") -> Tuple[bool, Optional[Dict], Optional[str]]:
+    @classmethod
+    def create_session(cls) -> aiohttp.ClientSession:
+        """Create a session with a connection pool tuned for the upstream APIs"""
+        connector = aiohttp.TCPConnector(**cls.CONNECTOR_OPTIONS)
+        return aiohttp.ClientSession(connector=connector, timeout=cls.TIMEOUTS["player_info"])
+    
+    @staticmethod
+    def _validate_session(session: aiohttp.ClientSession):
+        """Warn when an injected session's connector defeats connection reuse"""
+        connector = getattr(session, "connector", None)
+        if connector is None:
+            return
+        if getattr(connector, "force_close", False):
+            logger.warning("API session connector has force_close set; keep-alive is disabled")
+        if getattr(connector, "limit_per_host", 0) == 0:
+            logger.warning("API session connector has no per-host connection limit")
+        if not getattr(connector, "use_dns_cache", True):
+            logger.warning("API session connector has DNS caching disabled")
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the HTTP session, creating the client-owned one if needed"""
+        if self.session is None or (self._owns_session and self.session.closed):
+            self.session = self.create_session()
+            self._owns_session = True
+        return self.session
+    
+    def _get_circuit_breaker(self, endpoint: str) -> CircuitBreaker:
+        """Get the circuit breaker for an endpoint"""
+        breaker = self.circuit_breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                failure_threshold=self.breaker_failure_threshold,
+                recovery_timeout=self.breaker_recovery_timeout
+            )
+            self.circuit_breakers[endpoint] = breaker
+        return breaker
+    
+    async def _get(
+        self,
+        endpoint: str,
+        url: str,
+        as_json: bool = False,
+        validate: Optional[Callable[[Any], bool]] = None
+    ) -> Tuple[int, Any]:
+        """
+        GET a URL guarded by the endpoint's circuit breaker
+        
+        Raises CircuitOpenError without touching the network while the circuit
+        is open, and RateLimitedError while the host is blocked by a Retry-After
+        longer than max_retry_after. Network errors, 5xx responses, undecodable
+        JSON and 200 bodies rejected by `validate` count as failures.
+        """
+        # Checked before the breaker so a rejected call never takes a half-open probe
+        blocked_for = self._get_rate_limiter(url).blocked_for()
+        if blocked_for > self.max_retry_after:
+            raise RateLimitedError(blocked_for)
+        
+        breaker = self._get_circuit_breaker(endpoint)
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for {endpoint}, retry in {breaker.retry_in():.0f}s")
+        
+        try:
+            status, body = await self._get_with_retries(url, self.TIMEOUTS[endpoint], as_json)
+        except Exception:
+            breaker.record_failure()
+            raise
+        
+        if status >= 500 or (status == 200 and validate is not None and not validate(body)):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return status, body
+    
+    async def _get_with_retries(
+        self,
+        url: str,
+        timeout: aiohttp.ClientTimeout,
+        as_json: bool = False
+    ) -> Tuple[int, Any]:
+        """
+        GET a URL through the host's rate limiter, retrying timeouts, 429 and 5xx
+        
+        Retries use jittered exponential backoff and honour Retry-After. Network
+        errors from the final attempt are raised to the caller.
+        
+        Returns:
+            Tuple[status: int, body] where body is the parsed JSON (as_json) or
+            raw bytes on 200, the error text for JSON endpoints, None otherwise
+        """
+        limiter = self._get_rate_limiter(url)
+        session = self._get_session()
+        
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire(max_wait=self.max_retry_after)
+            delay = backoff_delay(attempt)
+            
+            try:
+                async with session.get(url, timeout=timeout) as response:
+                    status = response.status
+                    if status == 200:
+                        limiter.on_success()
+                        body = await response.read()
+                        # Decoded off the raw bytes with the fastest installed JSON library
+                        return status, json_codec.loads(body) if as_json else body
+                    
+                    retry_after = None
+                    if status == 429:
+                        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        limiter.on_rate_limited(retry_after)
+                    
+                    give_up = (
+                        status not in self.RETRYABLE_STATUSES
+                        or attempt == self.max_retries
+                        or (retry_after or 0) > self.max_retry_after
+                    )
+                    if give_up:
+                        return status, await response.text() if as_json else None
+                    
+            except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+                if attempt == self.max_retries:
+                    raise
+                status = type(e).__name__
+            
+            self.retries += 1
+            logger.warning(f"Retrying {urlparse(url).hostname} after {status} (attempt {attempt + 1}) in {delay:.2f}s")
+            await asyncio.sleep(delay)
+    
+    async def get_player_info(
+        self,
+        uid: str,
+        region: str = "IND",
+        consumer: Optional[str] = None
+    ) -> Tuple[bool, Optional[PlayerSnapshot], Optional[str]]:
         """
         Fetch player information from API
         
+        With stale_while_revalidate set, an entry that expired within that window
+        is returned immediately while a background fetch refreshes it. With
+        stale_if_error set, an upstream failure falls back to the last known data;
+        success is then True and the error slot carries STALE_DATA_NOTICE.
+        
         Returns:
-            Tuple[success: bool, data: Optional[Dict], error: Optional[str]]
+            Tuple[success: bool, data: Optional[PlayerSnapshot], error: Optional[str]]
         """
-        cache_key = self._get_cache_key("player_info", uid, region)
+        # The info API only takes the UID, so region is not part of the key
+        uid = normalize_uid(uid)
+        cache_key = self._get_cache_key("player_info", uid)
         
         # Check cache first
         cached_data = self._get_from_cache(cache_key)
+        self._record_lookup(consumer, cached_data is not None)
         if cached_data:
             logger.info(f"Cache hit for player {uid}")
             return True, cached_data, None
         
-        # Fetch from API
+        fetch = lambda: self._fetch_player_info(uid, cache_key)
+        stale_entry = self.cache.get_stale(cache_key)
+        
+        # Serve recently expired data now and refresh it in the background
+        if stale_entry is not None and stale_entry.staleness() <= self.stale_while_revalidate:
+            logger.info(f"Serving stale player {uid} while revalidating")
+            self.stale_served += 1
+            self._start_fetch(cache_key, fetch)
+            return True, stale_entry.data, None
+        
+        success, data, error = await self._coalesce(cache_key, fetch)
+        
+        if not success and error != PLAYER_NOT_FOUND:
+            if stale_entry is not None and stale_entry.staleness() <= self.stale_if_error:
+                logger.warning(f"Serving stale player {uid} after upstream error: {error}")
+                self.stale_on_error += 1
+                return True, stale_entry.data, STALE_DATA_NOTICE
+        
+        return success, data, error
+    
+    def is_player_cached(self, uid: str, min_remaining: float = 0) -> bool:
+        """Check if player info is cached with more than min_remaining seconds of TTL left"""
+        entry = self.cache.get_entry(self._get_cache_key("player_info", normalize_uid(uid)))
+        return entry is not None and not entry.is_expired() and entry.ttl - entry.age() > min_remaining
+    
+    def peek_player_info(self, uid: str) -> Optional[PlayerSnapshot]:
+        """Cached player info, stale included, without fetching or counting a lookup"""
+        entry = self.cache.get_stale(self._get_cache_key("player_info", normalize_uid(uid)))
+        return entry.data if entry is not None else None
+    
+    async def refresh_player_info(
+        self,
+        uid: str,
+        min_remaining: float = 0
+    ) -> Tuple[bool, Optional[PlayerSnapshot], Optional[str]]:
+        """
+        Re-fetch player info from upstream unless the cached copy is still fresh
+        
+        Used by background refreshers to keep entries warm. The cached entry is
+        reused only if it has more than min_remaining seconds of TTL left;
+        otherwise the disk tier is skipped and the info API is called (coalesced
+        with any in-flight request for the same UID).
+        
+        Returns:
+            Tuple[success: bool, data: Optional[PlayerSnapshot], error: Optional[str]]
+        """
+        uid = normalize_uid(uid)
+        cache_key = self._get_cache_key("player_info", uid)
+        
+        if self.is_player_cached(uid, min_remaining):
+            return True, self.cache.get_entry(cache_key).data, None
+        
+        if cache_key in self._inflight:
+            self.coalesced_requests += 1
+        future = self._start_fetch(cache_key, lambda: self._fetch_player_info(uid, cache_key))
+        return await asyncio.shield(future)
+    
+    @staticmethod
+    def _is_valid_player_payload(data: Any) -> bool:
+        """Check that an info API payload has the player section we parse"""
+        return isinstance(data, dict) and 'basicInfo' in data
+    
+    async def _fetch_player_info(self, uid: str, cache_key: CacheKey) -> Tuple[bool, Optional[PlayerSnapshot], Optional[str]]:
+        """Fetch player information from the info API and cache it"""
         try:
             url = self.INFO_API_URL.format(uid=uid)
             logger.info(f"Fetching player info for UID: {uid}")
             
-            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=15)) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    # Validate response
-                    if not data or 'basicInfo' not in data:
-                        return False, None, "Invalid API response"
-                    
-                    # Cache successful response
-                    self._add_to_cache(cache_key, data, ttl=300)
-                    return True, data, None
-                    
-                elif response.status == 404:
-                    return False, None, "Player not found"
-                elif response.status == 429:
-                    return False, None, "Rate limit exceeded. Please try again later"
-                else:
-                    error_text = await response.text()
-                    logger.error(f"API error {response.status}: {error_text}")
-                    return False, None, f"API error: {response.status}"
-                    
+            status, body = await self._get("player_info", url, as_json=True, validate=self._is_valid_player_payload)
+            if status == 200:
+                data = body
+                
+                # Validate response (already counted against the circuit breaker)
+                if not self._is_valid_player_payload(data):
+                    return False, None, "Invalid API response"
+                
+                # Parse once and cache the snapshot rather than the raw payload
+                player = PlayerSnapshot.from_payload(uid, data)
+                self.clans.record(uid, player)
+                self._add_to_cache(
+                    cache_key,
+                    player,
+                    ttl=self._get_ttl("player_info"),
+                    grace=max(self.stale_while_revalidate, self.stale_if_error)
+                )
+                self._notify_fetch(uid, player)
+                return True, player, None
+                
+            elif status == 404:
+                return False, None, PLAYER_NOT_FOUND
+            elif status == 429:
+                return False, None, "Rate limit exceeded. Please try again later"
+            else:
+                logger.error(f"API error {status}: {body}")
+                return False, None, f"API error: {status}"
+                
+        except RateLimitedError as e:
+            logger.warning(f"Not fetching player {uid}: {e}")
+            return False, None, "Rate limit exceeded. Please try again later"
+        except CircuitOpenError as e:
+            logger.warning(f"Not fetching player {uid}: {e}")
+            return False, None, "Player API is temporarily unavailable. Please try again shortly"
         except asyncio.TimeoutError:
             logger.error(f"Timeout fetching player {uid}")
             return False, None, "Request timeout. Please try again"
@@ -128,98 +556,333 @@ class FFAPIClient:
             logger.error(f"Unexpected error fetching player {uid}: {e}")
             return False, None, "Unexpected error occurred"
     
-    async def get_outfit_image(self, uid: str, region: str = "IND") -> Tuple[bool, Optional[bytes], Optional[str]]:
+    async def get_outfit_image(
+        self,
+        uid: str,
+        region: str = "IND",
+        consumer: Optional[str] = None
+    ) -> Tuple[bool, Optional[bytes], Optional[str]]:
         """
         Fetch player outfit image
         
         Returns:
             Tuple[success: bool, image_data: Optional[bytes], error: Optional[str]]
         """
+        uid = normalize_uid(uid)
+        region = str(region).strip().upper()
         cache_key = self._get_cache_key("outfit_image", uid, region)
         
         # Check cache
         cached_data = self._get_from_cache(cache_key)
+        self._record_lookup(consumer, cached_data is not None)
         if cached_data:
             logger.info(f"Cache hit for outfit image {uid}")
             return True, cached_data, None
         
+        return await self._coalesce(cache_key, lambda: self._fetch_outfit_image(uid, region, cache_key))
+    
+    async def _fetch_outfit_image(
+        self,
+        uid: str,
+        region: str,
+        cache_key: CacheKey
+    ) -> Tuple[bool, Optional[bytes], Optional[str]]:
+        """Fetch an outfit image from the outfit API and cache it"""
         try:
             url = self.OUTFIT_API_URL.format(uid=uid, region=region)
             logger.info(f"Fetching outfit image for UID: {uid}")
             
-            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=20)) as response:
-                if response.status == 200:
-                    image_data = await response.read()
-                    
-                    # Validate it's actually an image
-                    if len(image_data) < 100:
-                        return False, None, "Invalid image data"
-                    
-                    # Cache the image
-                    self._add_to_cache(cache_key, image_data, ttl=600)  # 10 minutes
-                    return True, image_data, None
-                else:
-                    return False, None, f"Failed to fetch outfit image: {response.status}"
-                    
+            status, image_data = await self._get("outfit_image", url)
+            if status == 200:
+                # Validate it's actually an image
+                if len(image_data) < 100:
+                    return False, None, "Invalid image data"
+                
+                # Only the processed variant is cached, so memory and uploads both shrink
+                if self.image_processor is not None:
+                    image_data = await self.image_processor.process(image_data)
+                
+                # Cache the image
+                self._add_to_cache(cache_key, image_data, ttl=self._get_ttl("outfit_image"))
+                return True, image_data, None
+            else:
+                return False, None, f"Failed to fetch outfit image: {status}"
+                
+        except RateLimitedError:
+            return False, None, "Outfit image service is rate limited. Please try again later"
+        except CircuitOpenError:
+            return False, None, "Outfit image service is temporarily unavailable"
         except asyncio.TimeoutError:
             return False, None, "Outfit image request timeout"
         except Exception as e:
             logger.error(f"Error fetching outfit image: {e}")
             return False, None, "Failed to fetch outfit image"
     
-    async def get_item_icon(self, item_id: str) -> Tuple[bool, Optional[bytes], Optional[str]]:
+    async def get_item_icon(
+        self,
+        item_id: str,
+        consumer: Optional[str] = None
+    ) -> Tuple[bool, Optional[bytes], Optional[str]]:
         """
         Fetch item icon
         
         Returns:
             Tuple[success: bool, image_data: Optional[bytes], error: Optional[str]]
         """
+        item_id = str(item_id).strip()
         cache_key = self._get_cache_key("item_icon", item_id)
         
         # Check cache
         cached_data = self._get_from_cache(cache_key)
+        self._record_lookup(consumer, cached_data is not None)
+        if cached_data == self.MISSING_ICON:
+            return False, None, f"Item icon not found: {item_id}"
         if cached_data:
             return True, cached_data, None
         
+        return await self._coalesce(cache_key, lambda: self._fetch_item_icon(item_id, cache_key))
+    
+    async def _fetch_item_icon(self, item_id: str, cache_key: CacheKey) -> Tuple[bool, Optional[bytes], Optional[str]]:
+        """Fetch an item icon from the CDN and cache it"""
         try:
             url = self.ITEM_ICON_URL.format(item_id=item_id)
             
-            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                if response.status == 200:
-                    image_data = await response.read()
-                    
-                    # Cache for longer (items don't change)
-                    self._add_to_cache(cache_key, image_data, ttl=3600)  # 1 hour
-                    return True, image_data, None
-                else:
-                    return False, None, f"Item icon not found: {item_id}"
-                    
+            status, image_data = await self._get("item_icon", url)
+            if status == 200:
+                # Icons are static, so they only leave the cache via LRU eviction
+                self._add_to_cache(cache_key, image_data, ttl=self._get_ttl("item_icon"))
+                return True, image_data, None
+            elif status == 404:
+                # Remember the miss briefly so loadouts with unknown items do not refetch it every time
+                self._add_to_cache(
+                    cache_key,
+                    self.MISSING_ICON,
+                    ttl=self.MISSING_ICON_TTL,
+                    persist=False
+                )
+                return False, None, f"Item icon not found: {item_id}"
+            else:
+                return False, None, f"Item icon not found: {item_id}"
+                
+        except RateLimitedError:
+            return False, None, "Item icon service is rate limited. Please try again later"
+        except CircuitOpenError:
+            return False, None, "Item icon service is temporarily unavailable"
         except Exception as e:
             logger.error(f"Error fetching item icon {item_id}: {e}")
             return False, None, "Failed to fetch item icon"
     
+    async def get_item_icons(self, item_ids: List[str], consumer: Optional[str] = None) -> Dict[str, Optional[bytes]]:
+        """
+        Fetch several item icons concurrently
+        
+        Each icon goes through get_item_icon, so cached icons are served from
+        memory and icons already being fetched are coalesced.
+        
+        Returns:
+            Dict of item_id -> icon bytes (None if it could not be fetched), in request order
+        """
+        item_ids = list(dict.fromkeys(str(item_id).strip() for item_id in item_ids))
+        results = await asyncio.gather(
+            *(self.get_item_icon(item_id, consumer=consumer) for item_id in item_ids),
+            return_exceptions=True
+        )
+        return {
+            item_id: None if isinstance(result, Exception) or not result[0] else result[1]
+            for item_id, result in zip(item_ids, results)
+        }
+    
+    async def get_item_grid(
+        self,
+        item_ids: List[str],
+        consumer: Optional[str] = None
+    ) -> Tuple[bool, Optional[bytes], Optional[str]]:
+        """
+        Render item icons into a single grid image
+        
+        The grid is cached under the sorted set of IDs (and drawn in that
+        order), so the same loadout always maps to one cached image.
+        
+        Returns:
+            Tuple[success: bool, image_data: Optional[bytes], error: Optional[str]]
+        """
+        if self.image_processor is None or not self.image_processor.enabled:
+            return False, None, "Image rendering is not available"
+        
+        item_ids = sorted({str(item_id).strip() for item_id in item_ids})
+        if not item_ids:
+            return False, None, "No items to show"
+        cache_key = self._get_cache_key("item_grid", *item_ids)
+        
+        cached_data = self._get_from_cache(cache_key)
+        self._record_lookup(consumer, cached_data is not None)
+        if cached_data:
+            return True, cached_data, None
+        
+        return await self._coalesce(cache_key, lambda: self._render_item_grid(item_ids, cache_key, consumer))
+    
+    async def _render_item_grid(
+        self,
+        item_ids: List[str],
+        cache_key: CacheKey,
+        consumer: Optional[str]
+    ) -> Tuple[bool, Optional[bytes], Optional[str]]:
+        """Fetch the icons for a grid, compose it off the event loop and cache it"""
+        icons = await self.get_item_icons(item_ids, consumer=consumer)
+        available = [icon for icon in icons.values() if icon]
+        if not available:
+            return False, None, "Failed to fetch item icons"
+        
+        rendered = await self.image_processor.compose_grid(available)
+        if rendered is None:
+            return False, None, "Failed to render item icons"
+        grid, drawn = rendered
+        
+        # A grid with missing or undrawable icons is not cached, so it is retried next time
+        if drawn == len(item_ids):
+            self._add_to_cache(cache_key, grid, ttl=self._get_ttl("item_grid"))
+        return True, grid, None
+    
+    def invalidate(self, endpoint: Optional[str] = None, uid: Optional[str] = None) -> int:
+        """
+        Remove cached data for an endpoint, a UID, or both combined
+        
+        Uses the cache's tag index, so the cost is proportional to the number
+        of matching entries. Matching disk-tier rows are removed in the background.
+        
+        Returns:
+            Number of in-memory entries removed
+        """
+        if endpoint is None and uid is None:
+            removed = len(self.cache)
+            self.clear_cache()
+            return removed
+        
+        if uid is not None:
+            uid = normalize_uid(uid)
+            keys = self.cache.keys_for_tag(("uid", uid))
+            if endpoint is not None:
+                keys = [key for key in keys if key[0] == endpoint]
+            for key in keys:
+                self.cache.delete(key)
+            endpoints = [endpoint] if endpoint is not None else self.UID_ENDPOINTS
+            disk_patterns = [f"{name}:{uid}" for name in endpoints] + [f"{name}:{uid}:*" for name in endpoints]
+        else:
+            keys = self.cache.invalidate_tag(("endpoint", endpoint))
+            disk_patterns = [f"{endpoint}:*"]
+        
+        if self.disk_cache is not None:
+            self._spawn(self.disk_cache.delete_matching(disk_patterns))
+        
+        logger.info(f"Invalidated {len(keys)} cache entries (endpoint={endpoint}, uid={uid})")
+        return len(keys)
+    
     def clear_cache(self, pattern: Optional[str] = None):
-        """Clear cache entries matching pattern"""
+        """Clear the whole cache, or all entries for an endpoint name or UID"""
         if pattern is None:
             self.cache.clear()
+            if self.disk_cache is not None:
+                self._spawn(self.disk_cache.clear())
             logger.info("Cache cleared completely")
+        elif pattern in self.cache_ttls:
+            self.invalidate(endpoint=pattern)
         else:
-            keys_to_delete = [k for k in self.cache.keys() if pattern in k]
-            for key in keys_to_delete:
-                del self.cache[key]
-            logger.info(f"Cleared {len(keys_to_delete)} cache entries matching '{pattern}'")
+            self.invalidate(uid=pattern)
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        total_entries = len(self.cache)
-        valid_entries = sum(1 for key in self.cache.keys() if self._is_cache_valid(key))
-        
-        return {
-            "total_entries": total_entries,
-            "valid_entries": valid_entries,
-            "expired_entries": total_entries - valid_entries,
-            "cache_ttl": self.cache_ttl
+        stats = self.cache.stats()
+        stats["cache_ttl"] = self.cache_ttl
+        stats["cache_ttls"] = dict(self.cache_ttls)
+        stats["entries_by_endpoint"] = {
+            endpoint: self.cache.count_tag(("endpoint", endpoint)) for endpoint in self.cache_ttls
         }
+        stats["coalesced_requests"] = self.coalesced_requests
+        stats["inflight_requests"] = len(self._inflight)
+        stats["stale_served"] = self.stale_served
+        stats["stale_on_error"] = self.stale_on_error
+        if self.disk_cache is not None:
+            stats["disk"] = self.disk_cache.stats()
+        stats["retries"] = self.retries
+        stats["clans"] = self.clans.stats()
+        if self.image_processor is not None:
+            stats["images"] = self.image_processor.stats()
+        stats["rate_limits"] = {host: limiter.stats() for host, limiter in self.rate_limits.items()}
+        stats["circuit_breakers"] = {
+            endpoint: breaker.stats() for endpoint, breaker in self.circuit_breakers.items()
+        }
+        stats["consumers"] = {name: dict(counts) for name, counts in self.consumer_stats.items()}
+        return stats
+    
+    async def close(self):
+        """Stop background cache maintenance and close the owned session"""
+        self.cache.close()
+        if self.disk_cache is not None:
+            self.disk_cache.close()
+        if self._owns_session and self.session is not None and not self.session.closed:
+            await self.session.close()
+
+
+class ScopedAPIClient:
+    """Per-cog view of a shared FFAPIClient that tags lookups with the cog name"""
+    
+    def __init__(self, client: FFAPIClient, consumer: str):
+        self.client = client
+        self.consumer = consumer
+    
+    async def get_player_info(self, uid: str, region: str = "IND") -> Tuple[bool, Optional[PlayerSnapshot], Optional[str]]:
+        return await self.client.get_player_info(uid, region, consumer=self.consumer)
+    
+    async def get_outfit_image(self, uid: str, region: str = "IND") -> Tuple[bool, Optional[bytes], Optional[str]]:
+        return await self.client.get_outfit_image(uid, region, consumer=self.consumer)
+    
+    async def get_item_icon(self, item_id: str) -> Tuple[bool, Optional[bytes], Optional[str]]:
+        return await self.client.get_item_icon(item_id, consumer=self.consumer)
+    
+    async def get_item_icons(self, item_ids: List[str]) -> Dict[str, Optional[bytes]]:
+        return await self.client.get_item_icons(item_ids, consumer=self.consumer)
+    
+    async def get_item_grid(self, item_ids: List[str]) -> Tuple[bool, Optional[bytes], Optional[str]]:
+        return await self.client.get_item_grid(item_ids, consumer=self.consumer)
+    
+    def __getattr__(self, name: str):
+        # Everything else (stats, cache management) goes to the shared client
+        return getattr(self.client, name)
+
+
+def get_shared_client(bot) -> FFAPIClient:
+    """
+    Get the process-wide API client registered on the bot, creating it on first use
+    
+    All cogs share this client so they also share one cache. It owns its own
+    pooled session rather than borrowing bot.session, so keep-alive connections
+    to the upstream hosts are reused across commands. Every call takes a
+    reference that the cog hands back with release_shared_client when it is
+    unloaded (which Bot.close does for all cogs at shutdown).
+    """
+    client = getattr(bot, "api_client", None)
+    if client is None:
+        client = FFAPIClient(
+            stale_while_revalidate=60,
+            stale_if_error=3600,
+            disk_cache=DiskCache("data/api_cache.db"),
+            image_processor=ImageProcessor()
+        )
+        bot.api_client = client
+        bot.api_client_references = 0
+    bot.api_client_references += 1
+    return client
+
+
+async def release_shared_client(bot):
+    """Drop a reference taken by get_shared_client, closing the client after the last one"""
+    client = getattr(bot, "api_client", None)
+    if client is None:
+        return
+    bot.api_client_references -= 1
+    if bot.api_client_references <= 0:
+        bot.api_client = None
+        await client.close()
 
 
 class DataFormatter:
@@ -0,0 +1,260 @@
+"""
+Cache Engine Module for Free Fire Bot
+Bounded in-memory LRU cache with per-entry TTLs and background expiry
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Any, Dict, Hashable, List, Set, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+# TTL for entries that only leave the cache through LRU eviction or invalidation
+NEVER_EXPIRE = float("inf")
+
+
+class CacheEntry:
+    """A single cached value with its expiry metadata"""
+
+    __slots__ = ("data", "timestamp", "ttl", "size", "grace")
+
+    def __init__(self, data: Any, ttl: Optional[float], size: int, grace: float = 0):
+        self.data = data
+        self.timestamp = time.monotonic()
+        self.ttl = ttl
+        self.size = size
+        self.grace = grace
+
+    def age(self) -> float:
+        """Seconds since the entry was stored"""
+        return time.monotonic() - self.timestamp
+
+    def is_expired(self) -> bool:
+        """Check if the entry has outlived its TTL"""
+        return self.ttl is not None and self.ttl != NEVER_EXPIRE and self.age() > self.ttl
+
+    def staleness(self) -> float:
+        """Seconds the entry has been expired for (0 while still fresh)"""
+        if self.ttl is None or self.ttl == NEVER_EXPIRE:
+            return 0
+        return max(0.0, self.age() - self.ttl)
+
+    def is_purgeable(self) -> bool:
+        """Check if the entry is expired and past its stale grace period"""
+        return self.is_expired() and self.staleness() > self.grace
+
+
+def estimate_size(value: Any) -> int:
+    """Cheap approximation of the memory held by a cached value, in bytes"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return 64 + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return 56 + sum(estimate_size(v) for v in value)
+    slots = getattr(type(value), "__slots__", None)
+    if slots:
+        return 16 + 8 * len(slots) + sum(estimate_size(getattr(value, slot, None)) for slot in slots)
+    return 32
+
+
+class LRUCache:
+    """
+    Bounded LRU cache with TTL expiry
+
+    Entries are evicted least-recently-used first once either the entry-count
+    or byte-size ceiling is exceeded. Expired entries are dropped on read and
+    by a periodic background sweep.
+
+    An optional tagger maps each key to tags (e.g. its endpoint or UID); the
+    cache keeps a tag -> keys index so a whole group can be invalidated in
+    O(matches).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: Optional[float] = 300,
+        sweep_interval: float = 60,
+        tagger: Optional[Callable[[Hashable], Iterable[Hashable]]] = None
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.sweep_interval = sweep_interval
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._total_bytes = 0
+        self._sweeper: Optional[asyncio.Task] = None
+        self._tagger = tagger
+        self._index: Dict[Hashable, Set[Hashable]] = {}
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and not entry.is_expired()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def keys(self) -> List[Hashable]:
+        """Snapshot of all stored keys, including expired ones not yet swept"""
+        return list(self._entries.keys())
+
+    def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        """Get the raw entry for a key without touching LRU order or counters"""
+        return self._entries.get(key)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a value if present and not expired, marking it recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.is_expired():
+            # Entries still in their grace period stay around to be served stale
+            if entry.is_purgeable():
+                self._remove(key)
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.data
+
+    def get_stale(self, key: Hashable) -> Optional[CacheEntry]:
+        """Get an entry even if expired, as long as it is within its grace period"""
+        entry = self._entries.get(key)
+        if entry is None or entry.is_purgeable():
+            return None
+        return entry
+
+    def set(self, key: Hashable, data: Any, ttl: Optional[float] = None, grace: float = 0):
+        """
+        Store a value, evicting least-recently-used entries if over budget
+
+        `grace` keeps the entry available through get_stale() for that many
+        seconds after it expires.
+        """
+        size = estimate_size(data)
+        if size > self.max_bytes:
+            logger.warning(f"Not caching {size} byte value: exceeds cache size limit")
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = CacheEntry(data, ttl if ttl is not None else self.default_ttl, size, grace)
+        self._total_bytes += size
+        if self._tagger is not None:
+            for tag in self._tagger(key):
+                self._index.setdefault(tag, set()).add(key)
+        self._evict()
+        self._ensure_sweeper()
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove a key, returning whether it was present"""
+        if key not in self._entries:
+            return False
+        self._remove(key)
+        return True
+
+    def clear(self):
+        """Remove every entry"""
+        self._entries.clear()
+        self._index.clear()
+        self._total_bytes = 0
+
+    def keys_for_tag(self, tag: Hashable) -> List[Hashable]:
+        """Snapshot of the keys carrying a tag"""
+        return list(self._index.get(tag, ()))
+
+    def count_tag(self, tag: Hashable) -> int:
+        """Number of stored keys carrying a tag"""
+        return len(self._index.get(tag, ()))
+
+    def invalidate_tag(self, tag: Hashable) -> List[Hashable]:
+        """Remove every entry carrying a tag, returning the removed keys"""
+        keys = self.keys_for_tag(tag)
+        for key in keys:
+            self._remove(key)
+        return keys
+
+    def purge_expired(self) -> int:
+        """Drop all expired entries past their grace period, returning how many were removed"""
+        expired = [key for key, entry in self._entries.items() if entry.is_purgeable()]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.size
+        if self._tagger is not None:
+            for tag in self._tagger(key):
+                keys = self._index.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._index[tag]
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _ensure_sweeper(self):
+        """Start the background expiry sweep once an event loop is running"""
+        if self._sweeper is not None and not self._sweeper.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._sweeper = loop.create_task(self._sweep_loop())
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                removed = self.purge_expired()
+                if removed:
+                    logger.debug(f"Cache sweep removed {removed} expired entries")
+            except Exception as e:
+                logger.error(f"Error during cache sweep: {e}")
+
+    def close(self):
+        """Stop the background sweeper"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get counters and current usage"""
+        expired = sum(1 for entry in self._entries.values() if entry.is_expired())
+        return {
+            "total_entries": len(self._entries),
+            "valid_entries": len(self._entries) - expired,
+            "expired_entries": expired,
+            "total_bytes": self._total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
@@ -0,0 +1,102 @@
+"""
+Clan Index Module for Free Fire Bot
+Guild data and known members collected from player snapshots
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, List, Any
+
+from utils.models import ClanSnapshot, PlayerSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class ClanMember:
+    """The few member fields /guildmembers shows, kept instead of whole snapshots"""
+
+    __slots__ = ("uid", "nickname", "level", "kills", "clan_role")
+
+    def __init__(self, player: PlayerSnapshot):
+        self.uid = player.uid
+        self.nickname = player.nickname
+        self.level = player.level
+        self.kills = player.kills
+        self.clan_role = player.clan_role
+
+    def __repr__(self) -> str:
+        return f"ClanMember(uid={self.uid!r}, nickname={self.nickname!r}, level={self.level})"
+
+
+class ClanIndex:
+    """
+    Guilds keyed by clanId, filled in from every player snapshot the client sees
+
+    Each clan keeps its latest ClanSnapshot plus a small ClanMember summary of
+    every member seen so far, so the index does not pin full player snapshots
+    (outfits, weapon skins) outside the cache's memory budget. Players of an
+    unchanged clan are pointed at the one stored ClanSnapshot, so cached
+    players share it instead of holding their own copies. A player moving to
+    another clan (or leaving one) is moved on their next fetch. Clans not
+    updated for the longest time are dropped once more than max_clans are
+    known.
+    """
+
+    def __init__(self, max_clans: int = 10000):
+        self.max_clans = max_clans
+        self._clans: "OrderedDict[str, ClanSnapshot]" = OrderedDict()
+        # clan_id -> uid -> summary of the latest player snapshot
+        self._members: Dict[str, Dict[str, ClanMember]] = {}
+        self._member_clan: Dict[str, str] = {}
+
+    def record(self, uid: str, player: PlayerSnapshot):
+        """Update the index from a player snapshot"""
+        clan = player.clan
+        clan_id = clan.clan_id if clan is not None else None
+
+        previous = self._member_clan.get(uid)
+        if previous is not None and previous != clan_id:
+            self._unlink_member(previous, uid)
+        if clan_id is None:
+            return
+
+        known = self._clans.get(clan_id)
+        if known is not None and known == clan:
+            player.clan = known
+        else:
+            self._clans[clan_id] = clan
+        self._clans.move_to_end(clan_id)
+
+        self._members.setdefault(clan_id, {})[uid] = ClanMember(player)
+        self._member_clan[uid] = clan_id
+
+        while len(self._clans) > self.max_clans:
+            evicted, _ = self._clans.popitem(last=False)
+            for member_uid in self._members.pop(evicted, {}):
+                self._member_clan.pop(member_uid, None)
+
+    def _unlink_member(self, clan_id: str, uid: str):
+        members = self._members.get(clan_id)
+        if members is not None:
+            members.pop(uid, None)
+        self._member_clan.pop(uid, None)
+
+    def get(self, clan_id: str) -> Optional[ClanSnapshot]:
+        """Latest known snapshot of a clan"""
+        return self._clans.get(str(clan_id))
+
+    def clan_of(self, uid: str) -> Optional[str]:
+        """Clan ID a player was last seen in"""
+        return self._member_clan.get(uid)
+
+    def members(self, clan_id: str) -> List[ClanMember]:
+        """Known members of a clan, highest level first"""
+        members = self._members.get(str(clan_id), {})
+        return sorted(members.values(), key=lambda member: (member.level, member.kills), reverse=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get index size"""
+        return {
+            "clans": len(self._clans),
+            "members": len(self._member_clan)
+        }
@@ -0,0 +1,298 @@
+"""
+Disk Cache Module for Free Fire Bot
+SQLite-backed second cache tier that survives bot restarts
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Any, Dict, Tuple, List
+
+from utils.cache import NEVER_EXPIRE
+from utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """
+    Persistent key/value cache stored in a SQLite database
+
+    Every value keeps its expiry time. Once the stored payloads exceed
+    max_bytes, expired rows and then the least recently used ones are evicted
+    in batches down to low_water * max_bytes, so a full cache is not rescanned
+    on every write. Reads only note their access time in memory; the times are
+    written with the next write or once flush_every reads have piled up. All
+    database work runs in a worker thread so the event loop is never blocked.
+    """
+
+    # Rows deleted per eviction query
+    EVICT_BATCH = 256
+
+    def __init__(
+        self,
+        path: str = "data/api_cache.db",
+        max_bytes: int = 256 * 1024 * 1024,
+        low_water: float = 0.9,
+        flush_every: int = 256
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.low_water_bytes = int(max_bytes * low_water)
+        self.flush_every = flush_every
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._entries = 0
+        # key -> last read time not yet written to the database
+        self._accessed: Dict[str, float] = {}
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use (called with the lock held)"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache(last_access)")
+            # Expired rows from a previous run are useless, drop them up front
+            conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+            conn.commit()
+            row = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+            self._entries, self._total_bytes = row
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _encode(data: Any) -> Tuple[str, bytes]:
+        if isinstance(data, (bytes, bytearray)):
+            return "bytes", bytes(data)
+        return "json", json_codec.dumps_bytes(data)
+
+    @staticmethod
+    def _decode(kind: str, value: bytes) -> Any:
+        if kind == "bytes":
+            return bytes(value)
+        return json_codec.loads(value)
+
+    def _get_sync(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT kind, value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            kind, value, expires_at = row
+            now = time.time()
+            if expires_at is not None and expires_at < now:
+                self._delete_locked(conn, key)
+                conn.commit()
+                return None
+
+            self._accessed[key] = now
+            if len(self._accessed) >= self.flush_every:
+                self._flush_accessed_locked(conn)
+                conn.commit()
+
+        ttl = NEVER_EXPIRE if expires_at is None else expires_at - now
+        return self._decode(kind, value), ttl
+
+    def _set_sync(self, key: str, data: Any, ttl: Optional[float]):
+        kind, value = self._encode(data)
+        size = len(value)
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        expires_at = None if ttl is None or ttl == NEVER_EXPIRE else now + ttl
+
+        with self._lock:
+            conn = self._connect()
+            self._delete_locked(conn, key)
+            conn.execute(
+                "INSERT INTO cache (key, kind, value, size, expires_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, value, size, expires_at, now)
+            )
+            self._entries += 1
+            self._total_bytes += size
+            self._flush_accessed_locked(conn)
+            self._evict_locked(conn)
+            conn.commit()
+
+    def _delete_locked(self, conn: sqlite3.Connection, key: str) -> bool:
+        row = conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return False
+        conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        self._entries -= 1
+        self._total_bytes -= row[0]
+        return True
+
+    def _flush_accessed_locked(self, conn: sqlite3.Connection):
+        if self._accessed:
+            conn.executemany(
+                "UPDATE cache SET last_access = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._accessed.items()]
+            )
+            self._accessed.clear()
+
+    def _evict_locked(self, conn: sqlite3.Connection):
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        # Expired rows go first
+        now = time.time()
+        count, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?",
+            (now,)
+        ).fetchone()
+        if count:
+            conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+            self._entries -= count
+            self._total_bytes -= size
+            self.evictions += count
+
+        # Then least recently used, a batch at a time off the last_access index
+        while self._total_bytes > self.low_water_bytes:
+            rows = conn.execute(
+                "SELECT key, size FROM cache ORDER BY last_access LIMIT ?", (self.EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for key, size in rows:
+                if self._total_bytes <= self.low_water_bytes:
+                    break
+                victims.append((key,))
+                self._entries -= 1
+                self._total_bytes -= size
+            conn.executemany("DELETE FROM cache WHERE key = ?", victims)
+            self.evictions += len(victims)
+
+    def _delete_sync(self, key: str) -> bool:
+        with self._lock:
+            conn = self._connect()
+            deleted = self._delete_locked(conn, key)
+            conn.commit()
+        return deleted
+
+    def _delete_matching_sync(self, patterns: List[str]) -> int:
+        with self._lock:
+            conn = self._connect()
+            deleted = 0
+            for pattern in patterns:
+                rows = conn.execute("SELECT key, size FROM cache WHERE key GLOB ?", (pattern,)).fetchall()
+                conn.execute("DELETE FROM cache WHERE key GLOB ?", (pattern,))
+                deleted += len(rows)
+                self._entries -= len(rows)
+                self._total_bytes -= sum(size for _, size in rows)
+            conn.commit()
+        return deleted
+
+    def _clear_sync(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM cache")
+            conn.commit()
+            self._accessed.clear()
+            self._entries = 0
+            self._total_bytes = 0
+
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Get a value from disk
+
+        Returns:
+            Tuple[data, remaining_ttl] or None if missing or expired
+        """
+        try:
+            result = await asyncio.to_thread(self._get_sync, key)
+        except Exception as e:
+            logger.error(f"Error reading disk cache: {e}")
+            result = None
+
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    async def set(self, key: str, data: Any, ttl: Optional[float]):
+        """Store a value on disk"""
+        try:
+            await asyncio.to_thread(self._set_sync, key, data, ttl)
+            self.writes += 1
+        except Exception as e:
+            logger.error(f"Error writing disk cache: {e}")
+
+    async def delete(self, key: str) -> bool:
+        """Remove a value from disk"""
+        try:
+            return await asyncio.to_thread(self._delete_sync, key)
+        except Exception as e:
+            logger.error(f"Error deleting from disk cache: {e}")
+            return False
+
+    async def delete_matching(self, patterns: List[str]) -> int:
+        """Remove every key matching any of the SQLite GLOB patterns"""
+        try:
+            return await asyncio.to_thread(self._delete_matching_sync, patterns)
+        except Exception as e:
+            logger.error(f"Error deleting from disk cache: {e}")
+            return 0
+
+    async def clear(self):
+        """Remove every value from disk"""
+        try:
+            await asyncio.to_thread(self._clear_sync)
+        except Exception as e:
+            logger.error(f"Error clearing disk cache: {e}")
+
+    def close(self):
+        """Write pending access times and close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._flush_accessed_locked(self._conn)
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Error saving disk cache access times: {e}")
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get counters and current usage"""
+        return {
+            "entries": self._entries,
+            "total_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions
+        }
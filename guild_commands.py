@@ -10,7 +10,7 @@ from datetime import datetime
 import logging
 from typing import Optional
 
-from utils.api_client import FFAPIClient, DataFormatter
+from utils.api_client import DataFormatter, get_shared_client, release_shared_client, normalize_uid
 
 logger = logging.getLogger(__name__)
 
@@ -20,9 +20,12 @@ class GuildCommands(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.api_client = FFAPIClient(bot.session)
+        self.api_client = get_shared_client(bot).for_consumer("guild")
         self.formatter = DataFormatter()
     
+    async def cog_unload(self):
+        await release_shared_client(self.bot)
+    
     @app_commands.command(name="guild", description="Get guild information from a player's UID")
     @app_commands.describe(
         uid="Player's UID to fetch guild from",
@@ -48,6 +51,7 @@ class GuildCommands(commands.Cog):
             region = str(region).upper()
             
             # Validate UID
+            uid = normalize_uid(uid)
             if not uid.isdigit() or len(uid) < 8 or len(uid) > 12:
                 embed = discord.Embed(
                     title="❌ Invalid UID",
@@ -58,7 +62,7 @@ class GuildCommands(commands.Cog):
                 return
             
             # Fetch player data
-            success, data, error = await self.api_client.get_player_info(uid, region)
+            success, player, error = await self.api_client.get_player_info(uid, region)
             
             if not success:
                 embed = discord.Embed(
@@ -69,13 +73,12 @@ class GuildCommands(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
             
-            clan_info = data.get('clanBasicInfo', {})
-            basic_info = data.get('basicInfo', {})
+            clan = player.clan
             
-            if not clan_info or not clan_info.get('clanName'):
+            if clan is None or not clan.name:
                 embed = discord.Embed(
                     title="❌ No Guild",
-                    description=f"**{basic_info.get('nickname', 'Player')}** is not in any guild.",
+                    description=f"**{player.nickname}** is not in any guild.",
                     color=discord.Color.orange()
                 )
                 await interaction.followup.send(embed=embed)
@@ -83,8 +86,8 @@ class GuildCommands(commands.Cog):
             
             # Create guild embed
             embed = discord.Embed(
-                title=f"🛡️ {clan_info.get('clanName', 'Unknown Guild')}",
-                description=f"**Guild ID:** `{clan_info.get('clanId', 'N/A')}`",
+                title=f"🛡️ {clan.name}",
+                description=f"**Guild ID:** `{clan.clan_id or 'N/A'}`",
                 color=discord.Color.gold(),
                 timestamp=datetime.utcnow()
             )
@@ -92,32 +95,29 @@ class GuildCommands(commands.Cog):
             # Guild Level
             embed.add_field(
                 name="⬆️ Guild Level",
-                value=f"**{clan_info.get('clanLevel', 0)}**",
+                value=f"**{clan.level}**",
                 inline=True
             )
             
             # Members
-            members = clan_info.get('clanMembers', 0)
-            max_members = clan_info.get('clanMaxMembers', 50)
             embed.add_field(
                 name="👥 Members",
-                value=f"**{members}**/{max_members}",
+                value=f"**{clan.members}**/{clan.max_members}",
                 inline=True
             )
             
             # Captain
-            captain = clan_info.get('captainName', 'Unknown')
             embed.add_field(
                 name="👑 Captain",
-                value=f"**{captain}**",
+                value=f"**{clan.captain_name}**",
                 inline=True
             )
             
             # Guild Stats
-            if clan_info.get('clanKills'):
+            if clan.kills:
                 stats_text = (
-                    f"**Kills:** {self.formatter.format_number(clan_info.get('clanKills', 0))}\n"
-                    f"**Wins:** {self.formatter.format_number(clan_info.get('clanWins', 0))}"
+                    f"**Kills:** {self.formatter.format_number(clan.kills)}\n"
+                    f"**Wins:** {self.formatter.format_number(clan.wins)}"
                 )
                 embed.add_field(
                     name="📊 Guild Stats",
@@ -126,15 +126,26 @@ class GuildCommands(commands.Cog):
                 )
             
             # Player's role in guild
-            player_role = basic_info.get('clanRole', 'Member')
             embed.add_field(
                 name="📌 Your Role",
-                value=f"**{player_role}**",
+                value=f"**{player.clan_role}**",
                 inline=True
             )
             
+            # Members seen in earlier lookups, from the client's clan index
+            known_members = len(self.api_client.clans.members(clan.clan_id or ''))
+            embed.add_field(
+                name="🗂️ Known Members",
+                value=f"**{known_members}** (see `/guildmembers {clan.clan_id or ''}`)",
+                inline=True
+            )
+            
+            footer_text = f"Requested by {interaction.user.display_name}"
+            if error:
+                # Served from stale cache after an upstream failure
+                footer_text = f"⚠️ {error} | {footer_text}"
             embed.set_footer(
-                text=f"Requested by {interaction.user.display_name}",
+                text=footer_text,
                 icon_url=interaction.user.display_avatar.url
             )
             
@@ -148,6 +159,58 @@ class GuildCommands(commands.Cog):
                 color=discord.Color.red()
             )
             await interaction.followup.send(embed=embed)
+    
+    @app_commands.command(name="guildmembers", description="List known members of a guild")
+    @app_commands.describe(guild="Guild ID, or the UID of a player known to be in it")
+    async def guild_members(self, interaction: discord.Interaction, guild: str):
+        """List a guild's members seen in earlier lookups, without any API calls"""
+        
+        clans = self.api_client.clans
+        clan_id = guild.strip()
+        if clans.get(clan_id) is None:
+            clan_id = clans.clan_of(normalize_uid(guild))
+        clan = clans.get(clan_id) if clan_id else None
+        
+        if clan is None:
+            embed = discord.Embed(
+                title="❌ Unknown Guild",
+                description=(
+                    "No members of this guild have been looked up yet.\n"
+                    "Use `/guild <uid>` or `/player <uid>` with a member's UID first."
+                ),
+                color=discord.Color.orange()
+            )
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+            return
+        
+        members = clans.members(clan_id)
+        embed = discord.Embed(
+            title=f"👥 {clan.name or 'Unknown Guild'}",
+            description=(
+                f"**Guild ID:** `{clan_id}`\n"
+                f"**{len(members)}** of {clan.members} members known"
+            ),
+            color=discord.Color.gold(),
+            timestamp=datetime.utcnow()
+        )
+        
+        lines = [
+            f"**{member.nickname}** (`{member.uid}`) • Lv {member.level} • "
+            f"{self.formatter.format_number(member.kills)} kills • {member.clan_role}"
+            for member in members
+        ]
+        # Embed fields hold at most 1024 characters each
+        chunk = []
+        for line in lines[:50]:
+            if len("\n".join(chunk + [line])) > 1024:
+                embed.add_field(name="\u200b", value="\n".join(chunk), inline=False)
+                chunk = []
+            chunk.append(line)
+        if chunk:
+            embed.add_field(name="\u200b", value="\n".join(chunk), inline=False)
+        
+        embed.set_footer(text=f"Requested by {interaction.user.display_name} | From cached and tracked lookups")
+        await interaction.response.send_message(embed=embed)
 
 
 async def setup(bot):
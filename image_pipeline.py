@@ -0,0 +1,160 @@
+"""
+Image Pipeline Module for Free Fire Bot
+Optional Pillow-based downsizing and re-encoding of upstream images
+"""
+
+import asyncio
+import io
+import logging
+import math
+from typing import Optional, Dict, Any, List, Tuple
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+    features = None
+
+logger = logging.getLogger(__name__)
+
+PIL_AVAILABLE = Image is not None
+
+
+def image_extension(data: bytes) -> str:
+    """File extension matching an encoded image's signature (png when unknown)"""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if data[:3] == b"\xff\xd8\xff":
+        return "jpg"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    return "png"
+
+
+class ImageProcessor:
+    """
+    Shrinks images to embed size and re-encodes them off the event loop
+
+    Images larger than max_size are downscaled, then encoded as WebP (or an
+    optimized PNG when WebP is unavailable or not wanted). The original bytes
+    are kept whenever processing fails or would not make them smaller.
+    Without Pillow installed every image passes through unchanged.
+    """
+
+    def __init__(self, max_size: Tuple[int, int] = (512, 512), format: str = "WEBP", quality: int = 80):
+        self.max_size = max_size
+        self.quality = quality
+        self.format = format.upper()
+        if PIL_AVAILABLE and self.format == "WEBP" and not features.check("webp"):
+            logger.warning("Pillow was built without WebP support, falling back to PNG")
+            self.format = "PNG"
+        if not PIL_AVAILABLE:
+            logger.info("Pillow not installed, images will be served as fetched")
+
+        # Counters
+        self.processed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @property
+    def enabled(self) -> bool:
+        return PIL_AVAILABLE
+
+    def _encode(self, image: "Image.Image") -> bytes:
+        """Encode an image in the configured format (called in a worker thread)"""
+        out = io.BytesIO()
+        if self.format == "WEBP":
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            image.save(out, "WEBP", quality=self.quality, method=4)
+        else:
+            image.save(out, "PNG", optimize=True)
+        return out.getvalue()
+
+    def _process_sync(self, data: bytes) -> bytes:
+        with Image.open(io.BytesIO(data)) as image:
+            image.load()
+            if image.width > self.max_size[0] or image.height > self.max_size[1]:
+                image.thumbnail(self.max_size, Image.LANCZOS)
+            return self._encode(image)
+
+    async def process(self, data: bytes) -> bytes:
+        """Downsize and re-encode an image, returning the smaller of result and original"""
+        if not self.enabled:
+            return data
+
+        try:
+            result = await asyncio.to_thread(self._process_sync, data)
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"Error processing image: {e}")
+            return data
+
+        if len(result) >= len(data):
+            self.skipped += 1
+            return data
+
+        self.processed += 1
+        self.bytes_in += len(data)
+        self.bytes_out += len(result)
+        return result
+
+    def _compose_grid_sync(self, icons: List[bytes], columns: int, cell: int, padding: int) -> Tuple[bytes, int]:
+        rows = math.ceil(len(icons) / columns)
+        canvas = Image.new(
+            "RGBA",
+            (columns * cell + (columns + 1) * padding, rows * cell + (rows + 1) * padding),
+            (0, 0, 0, 0)
+        )
+        drawn = 0
+        for position, data in enumerate(icons):
+            try:
+                with Image.open(io.BytesIO(data)) as icon:
+                    icon = icon.convert("RGBA")
+                icon.thumbnail((cell, cell), Image.LANCZOS)
+            except Exception as e:
+                logger.warning(f"Skipping unreadable icon in grid: {e}")
+                continue
+            row, column = divmod(position, columns)
+            x = padding + column * (cell + padding) + (cell - icon.width) // 2
+            y = padding + row * (cell + padding) + (cell - icon.height) // 2
+            canvas.paste(icon, (x, y), icon)
+            drawn += 1
+        return self._encode(canvas), drawn
+
+    async def compose_grid(
+        self,
+        icons: List[bytes],
+        columns: Optional[int] = None,
+        cell: int = 128,
+        padding: int = 8
+    ) -> Optional[Tuple[bytes, int]]:
+        """
+        Render icons left to right, top to bottom into one image
+
+        Returns the encoded grid and how many icons were actually drawn
+        (unreadable ones leave an empty cell), or None when Pillow is not
+        installed or rendering fails.
+        """
+        if not self.enabled or not icons:
+            return None
+        columns = columns or min(len(icons), 4)
+        try:
+            return await asyncio.to_thread(self._compose_grid_sync, icons, columns, cell, padding)
+        except Exception as e:
+            logger.error(f"Error composing icon grid: {e}")
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get counters and savings"""
+        return {
+            "enabled": self.enabled,
+            "format": self.format,
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out
+        }
@@ -0,0 +1,140 @@
+"""
+JSON Codec Module for Free Fire Bot
+Pluggable JSON encoding/decoding using the fastest installed library
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+# Backend name -> (loads, dumps to bytes); loads accepts str or bytes
+BACKENDS: Dict[str, tuple] = {"json": (json.loads, _stdlib_dumps)}
+if ujson is not None:
+    BACKENDS["ujson"] = (ujson.loads, lambda obj: ujson.dumps(obj, ensure_ascii=False).encode())
+if orjson is not None:
+    BACKENDS["orjson"] = (orjson.loads, orjson.dumps)
+
+# Preferred order when picking a default
+PREFERENCE = ("orjson", "ujson", "json")
+
+backend = next(name for name in PREFERENCE if name in BACKENDS)
+_loads: Callable[[Union[str, bytes]], Any] = BACKENDS[backend][0]
+_dumps: Callable[[Any], bytes] = BACKENDS[backend][1]
+
+
+def set_backend(name: str):
+    """Switch the JSON library used by loads/dumps (json, ujson or orjson)"""
+    global backend, _loads, _dumps
+    if name not in BACKENDS:
+        raise ValueError(f"JSON backend {name!r} is not installed (available: {', '.join(BACKENDS)})")
+    backend = name
+    _loads, _dumps = BACKENDS[name]
+    logger.info(f"Using {name} for JSON")
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """
+    Decode JSON from str or bytes
+
+    Decoding errors are raised as json.JSONDecodeError whatever the backend,
+    so callers only need to catch the stdlib exception.
+    """
+    try:
+        return _loads(data)
+    except json.JSONDecodeError:
+        raise
+    except ValueError as e:
+        text = data.decode(errors="replace") if isinstance(data, (bytes, bytearray)) else data
+        raise json.JSONDecodeError(str(e), text, 0) from e
+
+
+def dumps(obj: Any) -> str:
+    """Encode an object as compact JSON text"""
+    return _dumps(obj).decode()
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Encode an object as compact UTF-8 JSON bytes"""
+    return _dumps(obj)
+
+
+def _sample_player_payload() -> Dict[str, Any]:
+    """A payload shaped and sized like a real info API response"""
+    return {
+        "basicInfo": {
+            "accountId": "1234567890", "nickname": "ＦＦ・Ｐｌａｙｅｒ★", "region": "IND", "level": 72,
+            "exp": 4821937, "rank": "Heroic", "rankingPoints": 3712, "csRank": "Grandmaster",
+            "csRankingPoints": 112, "kills": 48213, "deaths": 19377, "headshots": 17022,
+            "creditScore": 100, "accountStatus": 0, "accountCreatedAt": 1561234567,
+            "lastLogin": 1729012345, "profileVisits": 90412, "clanRole": "Officer",
+            "badgeCnt": 47, "badgeId": 1001000087, "seasonId": 42, "title": 904090014,
+            "weaponSkinShows": [907190701 + i for i in range(8)], "releaseVersion": "OB46"
+        },
+        "profileInfo": {
+            "avatarId": 102000007, "clothes": [203000543 + i * 7 for i in range(12)],
+            "equipedSkills": [16, 1, 8, 2, 3, 5, 211000028, 4],
+            "isSelected": True, "pvePrimaryWeaponSkin": 907190702
+        },
+        "clanBasicInfo": {
+            "clanId": 3021912345, "clanName": "Ｎｉｇｈｔ　Ｏｗｌｓ", "clanLevel": 7, "clanMembers": 48,
+            "clanMaxMembers": 55, "captainId": 1987654321, "captainName": "Capt★", "clanKills": 912345,
+            "clanWins": 2231
+        },
+        "petInfo": {"id": 1300000071, "name": "Ottero", "level": 7, "exp": 6000, "skinId": 1310000071,
+                    "selectedSkillId": 1315000008},
+        "socialInfo": {"likes": 15023, "signature": "[b][c][FFD700]Road to Grandmaster 🔥 | DM for scrims",
+                       "language": "Language_EN", "modePrefer": "ModePrefer_BR"},
+        "creditScoreInfo": {"creditScore": 100, "rewardState": "REWARD_STATE_UNCLAIMED",
+                            "periodicSummaryEndTime": 1729600000},
+        "diamondCostRes": {"diamondCost": 390},
+        "equippedItems": [
+            {"itemId": 203000543 + i, "type": i % 6, "rarity": "Legendary" if i % 3 else "Epic",
+             "name": f"Item {i}", "expireAt": 0}
+            for i in range(40)
+        ]
+    }
+
+
+def benchmark(iterations: int = 20000) -> Dict[str, Dict[str, float]]:
+    """Time loads/dumps of a realistic player payload with every installed backend (µs per call)"""
+    import timeit
+
+    payload = _sample_player_payload()
+    encoded = _stdlib_dumps(payload)
+    results = {}
+    for name, (backend_loads, backend_dumps) in BACKENDS.items():
+        results[name] = {
+            "loads": timeit.timeit(lambda: backend_loads(encoded), number=iterations) / iterations * 1e6,
+            "dumps": timeit.timeit(lambda: backend_dumps(payload), number=iterations) / iterations * 1e6
+        }
+    return results
+
+
+if __name__ == "__main__":
+    size = len(_stdlib_dumps(_sample_player_payload()))
+    print(f"Player payload: {size} bytes, default backend: {backend}")
+    timings = benchmark()
+    baseline = timings["json"]
+    print(f"{'backend':<8}{'loads µs':>10}{'dumps µs':>10}{'loads x':>9}{'dumps x':>9}")
+    for name, timing in timings.items():
+        print(
+            f"{name:<8}{timing['loads']:>10.2f}{timing['dumps']:>10.2f}"
+            f"{baseline['loads'] / timing['loads']:>9.1f}{baseline['dumps'] / timing['dumps']:>9.1f}"
+        )
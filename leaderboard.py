@@ -0,0 +1,122 @@
+"""
+Leaderboard Module for Free Fire Bot
+Incrementally maintained per-server rankings of tracked players
+"""
+
+import bisect
+import logging
+from typing import Optional, Dict, List, Set, Tuple
+
+from utils.models import PlayerSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Metric key -> display name
+LEADERBOARD_METRICS = {
+    "kills": "Kills",
+    "kd": "K/D Ratio",
+    "level": "Level",
+    "headshots": "Headshots",
+    "kills_week": "Kills This Week"
+}
+
+
+def leaderboard_values(player: PlayerSnapshot, week_baseline_kills: Optional[int] = None) -> Dict[str, float]:
+    """Compute every leaderboard metric from a player snapshot"""
+    return {
+        "kills": player.kills,
+        "kd": player.kd_ratio,
+        "level": player.level,
+        "headshots": player.headshots,
+        "kills_week": player.kills - week_baseline_kills if week_baseline_kills is not None else 0
+    }
+
+
+class LeaderboardIndex:
+    """
+    Sorted rankings per (Discord server, metric)
+
+    Each ranking is a list of (-value, uid) kept sorted with bisect, so a
+    player update costs O(log n + n) in the worst case for the list shift and
+    reading the top k is O(k). Server membership is reference counted because
+    several members of one server can track the same UID.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, Dict[str, float]] = {}
+        self._names: Dict[str, str] = {}
+        # guild_id -> uid -> number of members tracking it
+        self._members: Dict[str, Dict[str, int]] = {}
+        self._uid_guilds: Dict[str, Set[str]] = {}
+        self._rankings: Dict[Tuple[str, str], List[Tuple[float, str]]] = {}
+
+    def _insert(self, guild_id: str, uid: str):
+        values = self._values.get(uid)
+        if values is None:
+            return
+        for metric in LEADERBOARD_METRICS:
+            ranking = self._rankings.setdefault((guild_id, metric), [])
+            bisect.insort(ranking, (-values[metric], uid))
+
+    def _discard(self, guild_id: str, uid: str):
+        values = self._values.get(uid)
+        if values is None:
+            return
+        for metric in LEADERBOARD_METRICS:
+            ranking = self._rankings.get((guild_id, metric))
+            if not ranking:
+                continue
+            entry = (-values[metric], uid)
+            position = bisect.bisect_left(ranking, entry)
+            if position < len(ranking) and ranking[position] == entry:
+                del ranking[position]
+
+    def add_member(self, guild_id: str, uid: str):
+        """Count a server member tracking a UID"""
+        members = self._members.setdefault(guild_id, {})
+        members[uid] = members.get(uid, 0) + 1
+        if members[uid] == 1:
+            self._uid_guilds.setdefault(uid, set()).add(guild_id)
+            self._insert(guild_id, uid)
+
+    def remove_member(self, guild_id: str, uid: str):
+        """Uncount a server member tracking a UID"""
+        members = self._members.get(guild_id)
+        if not members or uid not in members:
+            return
+        members[uid] -= 1
+        if members[uid] == 0:
+            del members[uid]
+            self._discard(guild_id, uid)
+            guilds = self._uid_guilds.get(uid)
+            if guilds is not None:
+                guilds.discard(guild_id)
+                if not guilds:
+                    del self._uid_guilds[uid]
+
+    def is_ranked(self, uid: str) -> bool:
+        """Check if a UID belongs to any server's leaderboard"""
+        return uid in self._uid_guilds
+
+    def update_player(self, uid: str, nickname: str, values: Dict[str, float]):
+        """Store a player's latest metrics and reposition it in every ranking it is in"""
+        guilds = self._uid_guilds.get(uid, ())
+        for guild_id in guilds:
+            self._discard(guild_id, uid)
+        self._values[uid] = values
+        self._names[uid] = nickname
+        for guild_id in guilds:
+            self._insert(guild_id, uid)
+
+    def top(self, guild_id: str, metric: str, k: int = 10) -> List[Tuple[str, str, float]]:
+        """Best k (uid, nickname, value) entries for a server and metric"""
+        ranking = self._rankings.get((guild_id, metric), [])
+        return [(uid, self._names.get(uid, "Unknown"), -value) for value, uid in ranking[:k]]
+
+    def member_count(self, guild_id: str) -> int:
+        """Distinct tracked UIDs in a server"""
+        return len(self._members.get(guild_id, ()))
+
+    def ranked_count(self, guild_id: str) -> int:
+        """Tracked UIDs in a server with known stats"""
+        return len(self._rankings.get((guild_id, "kills"), ()))
@@ -0,0 +1,120 @@
+"""
+Models Module for Free Fire Bot
+Parsed player and clan snapshots built once from info API payloads
+"""
+
+from typing import Optional, Dict, Any
+
+# (attribute, payload section, payload key, default)
+PLAYER_FIELDS = (
+    ("nickname", "basicInfo", "nickname", "Unknown"),
+    ("level", "basicInfo", "level", 0),
+    ("exp", "basicInfo", "exp", 0),
+    ("rank", "basicInfo", "rank", "Unranked"),
+    ("kills", "basicInfo", "kills", 0),
+    ("deaths", "basicInfo", "deaths", 0),
+    ("headshots", "basicInfo", "headshots", 0),
+    ("credit_score", "basicInfo", "creditScore", 0),
+    ("account_status", "basicInfo", "accountStatus", None),
+    ("account_created_at", "basicInfo", "accountCreatedAt", 0),
+    ("last_login", "basicInfo", "lastLogin", 0),
+    ("profile_visits", "basicInfo", "profileVisits", 0),
+    ("clan_role", "basicInfo", "clanRole", "Member"),
+    ("weapon_skins", "basicInfo", "weaponSkinShows", ()),
+    ("clothes", "profileInfo", "clothes", ()),
+    ("likes", "socialInfo", "likes", 0)
+)
+
+# (attribute, clanBasicInfo key, default)
+CLAN_FIELDS = (
+    ("clan_id", "clanId", None),
+    ("name", "clanName", None),
+    ("level", "clanLevel", 0),
+    ("members", "clanMembers", 0),
+    ("max_members", "clanMaxMembers", 50),
+    ("captain_name", "captainName", "Unknown"),
+    ("kills", "clanKills", 0),
+    ("wins", "clanWins", 0)
+)
+
+
+def normalize_uid(uid) -> str:
+    """
+    Canonical form of a player UID: surrounding whitespace and leading zeros removed
+
+    Non-numeric input is returned stripped so callers can still reject it.
+    """
+    uid = str(uid).strip()
+    if uid.isdigit():
+        return uid.lstrip("0") or "0"
+    return uid
+
+
+class ClanSnapshot:
+    """The clanBasicInfo fields the cogs use"""
+
+    __slots__ = tuple(field[0] for field in CLAN_FIELDS)
+
+    @classmethod
+    def from_payload(cls, clan_info: Optional[Dict]) -> Optional["ClanSnapshot"]:
+        """Parse a clanBasicInfo block, or None when the player has no clan"""
+        if not clan_info or not (clan_info.get('clanId') or clan_info.get('clanName')):
+            return None
+        clan = cls()
+        for attr, key, default in CLAN_FIELDS:
+            setattr(clan, attr, clan_info.get(key, default))
+        if clan.clan_id is not None:
+            clan.clan_id = str(clan.clan_id)
+        return clan
+
+    def to_payload(self) -> Dict[str, Any]:
+        """Rebuild the clanBasicInfo block, e.g. for the disk tier"""
+        return {key: getattr(self, attr) for attr, key, _ in CLAN_FIELDS}
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ClanSnapshot):
+            return NotImplemented
+        return all(getattr(self, attr) == getattr(other, attr) for attr in self.__slots__)
+
+    __hash__ = None
+
+
+class PlayerSnapshot:
+    """
+    The info API fields the cogs use, parsed once at fetch time
+
+    This is what the client caches and hands out instead of the raw JSON,
+    so commands read attributes rather than walking nested dicts.
+    """
+
+    __slots__ = ("uid", "clan") + tuple(field[0] for field in PLAYER_FIELDS)
+
+    @classmethod
+    def from_payload(cls, uid: str, data: Dict) -> "PlayerSnapshot":
+        """Parse an info API payload"""
+        player = cls()
+        player.uid = uid
+        sections = {}
+        for attr, section, key, default in PLAYER_FIELDS:
+            if section not in sections:
+                sections[section] = data.get(section) or {}
+            setattr(player, attr, sections[section].get(key, default))
+        player.clan = ClanSnapshot.from_payload(data.get('clanBasicInfo'))
+        return player
+
+    def to_payload(self) -> Dict[str, Any]:
+        """Rebuild an info API shaped payload holding just these fields"""
+        payload: Dict[str, Any] = {}
+        for attr, section, key, _ in PLAYER_FIELDS:
+            payload.setdefault(section, {})[key] = getattr(self, attr)
+        if self.clan is not None:
+            payload['clanBasicInfo'] = self.clan.to_payload()
+        return payload
+
+    @property
+    def kd_ratio(self) -> float:
+        """Kills per death (kills when there are no deaths)"""
+        return self.kills / self.deaths if self.deaths else float(self.kills)
+
+    def __repr__(self) -> str:
+        return f"PlayerSnapshot(uid={self.uid!r}, nickname={self.nickname!r}, level={self.level})"
@@ -9,22 +9,52 @@ from discord.ext import commands
 import io
 from datetime import datetime
 import logging
-from typing import Optional
+from typing import List, Optional
 import asyncio
 
-from utils.api_client import FFAPIClient, DataFormatter
+from utils.api_client import DataFormatter, get_shared_client, release_shared_client, normalize_uid
+from utils.image_pipeline import image_extension
 
 logger = logging.getLogger(__name__)
 
+# (field name, PlayerSnapshot attribute) compared by /compare
+COMPARE_METRICS = (
+    ("⬆️ Level", "level"),
+    ("💀 Kills", "kills"),
+    ("📊 K/D Ratio", "kd_ratio"),
+    ("🎯 Headshots", "headshots"),
+    ("📊 Credit Score", "credit_score")
+)
+
+
+def rank_descending(values: List[float]) -> List[int]:
+    """Competition ranks (1 = highest, ties share a rank) for a column of values"""
+    order = sorted(range(len(values)), key=lambda i: values[i], reverse=True)
+    ranks = [0] * len(values)
+    for position, i in enumerate(order):
+        if position and values[i] == values[order[position - 1]]:
+            ranks[i] = ranks[order[position - 1]]
+        else:
+            ranks[i] = position + 1
+    return ranks
+
 
 class PlayerCommands(commands.Cog):
     """Commands for player information and statistics"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.api_client = FFAPIClient(bot.session)
+        self.api_client = get_shared_client(bot).for_consumer("player")
         self.formatter = DataFormatter()
         self.cooldowns = {}
+        # Seconds to wait for the outfit image once the embed is ready
+        self.outfit_soft_deadline = 2.0
+        self._pending_image_edits = set()
+    
+    async def cog_unload(self):
+        for task in tuple(self._pending_image_edits):
+            task.cancel()
+        await release_shared_client(self.bot)
         
     @app_commands.command(name="player", description="Get detailed information about a Free Fire player")
     @app_commands.describe(
@@ -61,6 +91,7 @@ class PlayerCommands(commands.Cog):
             region = str(region).upper()
             
             # Validate UID
+            uid = normalize_uid(uid)
             if not uid.isdigit() or len(uid) < 8 or len(uid) > 12:
                 embed = discord.Embed(
                     title="❌ Invalid UID",
@@ -70,10 +101,14 @@ class PlayerCommands(commands.Cog):
                 await interaction.followup.send(embed=embed, ephemeral=True)
                 return
             
+            # Start the outfit fetch now so it overlaps with the player lookup
+            outfit_task = asyncio.create_task(self.api_client.get_outfit_image(uid, region))
+            
             # Fetch player data
-            success, data, error = await self.api_client.get_player_info(uid, region)
+            success, player, error = await self.api_client.get_player_info(uid, region)
             
             if not success:
+                outfit_task.cancel()
                 embed = discord.Embed(
                     title="❌ Error",
                     description=error or "Failed to fetch player information",
@@ -82,21 +117,16 @@ class PlayerCommands(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
             
-            # Extract data
-            basic_info = data.get('basicInfo', {})
-            social_info = data.get('socialInfo', {})
-            clan_info = data.get('clanBasicInfo', {})
-            
             # Create main embed
             embed = discord.Embed(
-                title=f"🎮 {basic_info.get('nickname', 'Unknown Player')}",
+                title=f"🎮 {player.nickname}",
                 description=f"**UID:** `{uid}` | **Region:** {self.formatter.get_region_flag(region)} {region}",
                 color=discord.Color.blue(),
                 timestamp=datetime.utcnow()
             )
             
             # Account Status
-            account_status = "✅ Active" if not basic_info.get('accountStatus') else "⛔ Banned"
+            account_status = "✅ Active" if not player.account_status else "⛔ Banned"
             embed.add_field(
                 name="📊 Account Status",
                 value=account_status,
@@ -104,33 +134,28 @@ class PlayerCommands(commands.Cog):
             )
             
             # Level and XP
-            level = basic_info.get('level', 0)
-            exp = basic_info.get('exp', 0)
             embed.add_field(
                 name="⬆️ Level",
-                value=f"**{level}** ({self.formatter.format_number(exp)} XP)",
+                value=f"**{player.level}** ({self.formatter.format_number(player.exp)} XP)",
                 inline=True
             )
             
             # Rank
-            rank = basic_info.get('rank', 'Unranked')
-            rank_emoji = self.formatter.get_rank_emoji(rank)
+            rank_emoji = self.formatter.get_rank_emoji(player.rank)
             embed.add_field(
                 name="🏆 Rank",
-                value=f"{rank_emoji} {rank}",
+                value=f"{rank_emoji} {player.rank}",
                 inline=True
             )
             
             # Statistics
-            kills = basic_info.get('kills', 0)
-            deaths = basic_info.get('deaths', 0) 
-            kd_ratio = self.formatter.calculate_kd_ratio(kills, deaths)
+            kd_ratio = self.formatter.calculate_kd_ratio(player.kills, player.deaths)
             
             stats_text = (
-                f"**Kills:** {self.formatter.format_number(kills)}\n"
-                f"**Deaths:** {self.formatter.format_number(deaths)}\n"
+                f"**Kills:** {self.formatter.format_number(player.kills)}\n"
+                f"**Deaths:** {self.formatter.format_number(player.deaths)}\n"
                 f"**K/D Ratio:** {kd_ratio}\n"
-                f"**Headshots:** {self.formatter.format_number(basic_info.get('headshots', 0))}"
+                f"**Headshots:** {self.formatter.format_number(player.headshots)}"
             )
             embed.add_field(
                 name="📈 Combat Stats",
@@ -139,11 +164,12 @@ class PlayerCommands(commands.Cog):
             )
             
             # Guild/Clan Information
-            if clan_info and clan_info.get('clanName'):
+            clan = player.clan
+            if clan is not None and clan.name:
                 clan_text = (
-                    f"**Name:** {clan_info.get('clanName', 'N/A')}\n"
-                    f"**Level:** {clan_info.get('clanLevel', 0)}\n"
-                    f"**Members:** {clan_info.get('clanMembers', 0)}"
+                    f"**Name:** {clan.name}\n"
+                    f"**Level:** {clan.level}\n"
+                    f"**Members:** {clan.members}"
                 )
                 embed.add_field(
                     name="🛡️ Guild",
@@ -158,11 +184,9 @@ class PlayerCommands(commands.Cog):
                 )
             
             # Social Stats
-            likes = social_info.get('likes', 0)
-            visitors = basic_info.get('profileVisits', 0)
             social_text = (
-                f"**Likes:** {self.formatter.format_number(likes)}\n"
-                f"**Visitors:** {self.formatter.format_number(visitors)}"
+                f"**Likes:** {self.formatter.format_number(player.likes)}\n"
+                f"**Visitors:** {self.formatter.format_number(player.profile_visits)}"
             )
             embed.add_field(
                 name="💫 Social",
@@ -171,7 +195,7 @@ class PlayerCommands(commands.Cog):
             )
             
             # Credit Score
-            credit_score = basic_info.get('creditScore', 0)
+            credit_score = player.credit_score
             if credit_score >= 80:
                 credit_emoji = "💚"
             elif credit_score >= 60:
@@ -186,7 +210,7 @@ class PlayerCommands(commands.Cog):
             )
             
             # Account Creation
-            create_time = basic_info.get('accountCreatedAt', 0)
+            create_time = player.account_created_at
             if create_time > 0:
                 create_date = self.formatter.format_timestamp(create_time)
                 embed.add_field(
@@ -196,7 +220,7 @@ class PlayerCommands(commands.Cog):
                 )
             
             # Last Login
-            last_login = basic_info.get('lastLogin', 0)
+            last_login = player.last_login
             if last_login > 0:
                 last_login_date = self.formatter.format_timestamp(last_login)
                 embed.add_field(
@@ -205,24 +229,36 @@ class PlayerCommands(commands.Cog):
                     inline=False
                 )
             
+            footer_text = f"Requested by {interaction.user.display_name}"
+            if error:
+                # Served from stale cache after an upstream failure
+                footer_text = f"⚠️ {error} | {footer_text}"
             embed.set_footer(
-                text=f"Requested by {interaction.user.display_name}",
+                text=footer_text,
                 icon_url=interaction.user.display_avatar.url
             )
             
-            # Try to fetch outfit image
+            # Give the outfit image a short grace period, then send without it
             outfit_file = None
             try:
-                success_img, image_data, error_img = await self.api_client.get_outfit_image(uid, region)
-                if success_img and image_data:
-                    outfit_file = discord.File(io.BytesIO(image_data), filename=f"outfit_{uid}.png")
-                    embed.set_image(url=f"attachment://outfit_{uid}.png")
+                success_img, image_data, error_img = await asyncio.wait_for(
+                    asyncio.shield(outfit_task),
+                    timeout=self.outfit_soft_deadline
+                )
+                outfit_file = self._attach_outfit(embed, uid, success_img, image_data)
+            except asyncio.TimeoutError:
+                pass
             except Exception as e:
                 logger.warning(f"Failed to fetch outfit image: {e}")
             
             # Send response
             if outfit_file:
                 await interaction.followup.send(embed=embed, file=outfit_file)
+            elif not outfit_task.done():
+                message = await interaction.followup.send(embed=embed, wait=True)
+                edit_task = asyncio.create_task(self._edit_in_outfit(message, embed, uid, outfit_task))
+                self._pending_image_edits.add(edit_task)
+                edit_task.add_done_callback(self._pending_image_edits.discard)
             else:
                 await interaction.followup.send(embed=embed)
                 
@@ -235,10 +271,47 @@ class PlayerCommands(commands.Cog):
             )
             await interaction.followup.send(embed=embed)
     
-    @app_commands.command(name="compare", description="Compare two Free Fire players")
+    def _attach_outfit(
+        self,
+        embed: discord.Embed,
+        uid: str,
+        success: bool,
+        image_data: Optional[bytes]
+    ) -> Optional[discord.File]:
+        """Point the embed at the outfit image and build its attachment"""
+        if not success or not image_data:
+            return None
+        # The image pipeline may have re-encoded it, e.g. to WebP
+        filename = f"outfit_{uid}.{image_extension(image_data)}"
+        embed.set_image(url=f"attachment://{filename}")
+        return discord.File(io.BytesIO(image_data), filename=filename)
+    
+    async def _edit_in_outfit(
+        self,
+        message: discord.WebhookMessage,
+        embed: discord.Embed,
+        uid: str,
+        outfit_task: asyncio.Task
+    ):
+        """Add the outfit image to an already-sent /player embed once it arrives"""
+        try:
+            success_img, image_data, error_img = await outfit_task
+            outfit_file = self._attach_outfit(embed, uid, success_img, image_data)
+            if outfit_file:
+                await message.edit(embed=embed, attachments=[outfit_file])
+        except Exception as e:
+            logger.warning(f"Failed to add outfit image for {uid}: {e}")
+    
+    @app_commands.command(name="compare", description="Compare up to 8 Free Fire players")
     @app_commands.describe(
         uid1="First player's UID",
         uid2="Second player's UID",
+        uid3="Third player's UID",
+        uid4="Fourth player's UID",
+        uid5="Fifth player's UID",
+        uid6="Sixth player's UID",
+        uid7="Seventh player's UID",
+        uid8="Eighth player's UID",
         region="Region (default: IND)"
     )
     @app_commands.choices(region=[
@@ -251,9 +324,15 @@ class PlayerCommands(commands.Cog):
         interaction: discord.Interaction,
         uid1: str,
         uid2: str,
+        uid3: Optional[str] = None,
+        uid4: Optional[str] = None,
+        uid5: Optional[str] = None,
+        uid6: Optional[str] = None,
+        uid7: Optional[str] = None,
+        uid8: Optional[str] = None,
         region: str = "IND"
     ):
-        """Compare statistics between two players"""
+        """Compare statistics between two to eight players"""
         
         await interaction.response.defer()
         
@@ -261,8 +340,12 @@ class PlayerCommands(commands.Cog):
             # Ensure region is a string
             region = str(region).upper()
             
-            # Validate UIDs
-            for uid in [uid1, uid2]:
+            # Validate UIDs, dropping repeats
+            uids = []
+            for uid in (uid1, uid2, uid3, uid4, uid5, uid6, uid7, uid8):
+                if uid is None:
+                    continue
+                uid = normalize_uid(uid)
                 if not uid.isdigit() or len(uid) < 8 or len(uid) > 12:
                     embed = discord.Embed(
                         title="❌ Invalid UID",
@@ -271,90 +354,79 @@ class PlayerCommands(commands.Cog):
                     )
                     await interaction.followup.send(embed=embed, ephemeral=True)
                     return
+                if uid not in uids:
+                    uids.append(uid)
             
-            # Fetch both players concurrently
+            # Fetch every player concurrently; the client coalesces repeats and serves cached ones
             results = await asyncio.gather(
-                self.api_client.get_player_info(uid1, region),
-                self.api_client.get_player_info(uid2, region),
+                *(self.api_client.get_player_info(uid, region) for uid in uids),
                 return_exceptions=True
             )
             
-            success1, data1, error1 = results[0]
-            success2, data2, error2 = results[1]
+            players = []
+            failures = []
+            for uid, result in zip(uids, results):
+                if isinstance(result, Exception) or not result[0]:
+                    failures.append(f"`{uid}`: {result if isinstance(result, Exception) else result[2]}")
+                else:
+                    players.append(result[1])
             
-            if not success1 or not success2:
+            if len(players) < 2:
                 embed = discord.Embed(
                     title="❌ Error Fetching Players",
-                    description=f"Player 1: {error1 or 'OK'}\nPlayer 2: {error2 or 'OK'}",
+                    description="\n".join(failures) or "Need at least two different players to compare",
                     color=discord.Color.red()
                 )
                 await interaction.followup.send(embed=embed)
                 return
             
-            # Extract basic info
-            p1_basic = data1.get('basicInfo', {})
-            p2_basic = data2.get('basicInfo', {})
+            names = [player.nickname for player in players]
             
             # Create comparison embed
             embed = discord.Embed(
                 title="⚔️ Player Comparison",
-                description=f"Comparing **{p1_basic.get('nickname', 'Player 1')}** vs **{p2_basic.get('nickname', 'Player 2')}**",
+                description="Comparing " + " vs ".join(f"**{name}**" for name in names),
                 color=discord.Color.purple(),
                 timestamp=datetime.utcnow()
             )
             
-            # Compare levels
-            level1 = p1_basic.get('level', 0)
-            level2 = p2_basic.get('level', 0)
-            level_winner = "🟢" if level1 > level2 else ("🔴" if level1 < level2 else "🟡")
-            embed.add_field(
-                name="⬆️ Level",
-                value=f"{level_winner} **{level1}** vs **{level2}**",
-                inline=True
-            )
-            
-            # Compare kills
-            kills1 = p1_basic.get('kills', 0)
-            kills2 = p2_basic.get('kills', 0)
-            kills_winner = "🟢" if kills1 > kills2 else ("🔴" if kills1 < kills2 else "🟡")
-            embed.add_field(
-                name="💀 Kills",
-                value=f"{kills_winner} **{self.formatter.format_number(kills1)}** vs **{self.formatter.format_number(kills2)}**",
-                inline=True
-            )
+            # Each metric as one column of values, ranked once over all players
+            medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+            wins = [0] * len(players)
+            for label, key in COMPARE_METRICS:
+                values = [getattr(player, key) for player in players]
+                if key == "kd_ratio":
+                    shown = [f"{value:.2f}" for value in values]
+                else:
+                    shown = [self.formatter.format_number(value) for value in values]
+                
+                ranks = rank_descending(values)
+                for i, rank in enumerate(ranks):
+                    if rank == 1:
+                        wins[i] += 1
+                
+                order = sorted(range(len(players)), key=lambda i: ranks[i])
+                embed.add_field(
+                    name=label,
+                    value="\n".join(
+                        f"{medals.get(ranks[i], f'`#{ranks[i]}`')} {names[i]}: **{shown[i]}**" for i in order
+                    ),
+                    inline=True
+                )
             
-            # Compare K/D
-            kd1 = self.formatter.calculate_kd_ratio(kills1, p1_basic.get('deaths', 0))
-            kd2 = self.formatter.calculate_kd_ratio(kills2, p2_basic.get('deaths', 0))
-            kd_winner = "🟢" if float(kd1) > float(kd2) else ("🔴" if float(kd1) < float(kd2) else "🟡")
+            best = max(wins)
             embed.add_field(
-                name="📊 K/D Ratio",
-                value=f"{kd_winner} **{kd1}** vs **{kd2}**",
-                inline=True
+                name="🏆 Most Categories Won",
+                value=", ".join(f"**{names[i]}**" for i, count in enumerate(wins) if count == best)
+                      + f" ({best}/{len(COMPARE_METRICS)})",
+                inline=False
             )
             
-            # Compare headshots
-            hs1 = p1_basic.get('headshots', 0)
-            hs2 = p2_basic.get('headshots', 0)
-            hs_winner = "🟢" if hs1 > hs2 else ("🔴" if hs1 < hs2 else "🟡")
-            embed.add_field(
-                name="🎯 Headshots",
-                value=f"{hs_winner} **{self.formatter.format_number(hs1)}** vs **{self.formatter.format_number(hs2)}**",
-                inline=True
-            )
-            
-            # Compare credit score
-            cs1 = p1_basic.get('creditScore', 0)
-            cs2 = p2_basic.get('creditScore', 0)
-            cs_winner = "🟢" if cs1 > cs2 else ("🔴" if cs1 < cs2 else "🟡")
-            embed.add_field(
-                name="📊 Credit Score",
-                value=f"{cs_winner} **{cs1}** vs **{cs2}**",
-                inline=True
-            )
+            if failures:
+                embed.add_field(name="⚠️ Not Loaded", value="\n".join(failures), inline=False)
             
             embed.set_footer(
-                text=f"Requested by {interaction.user.display_name} | 🟢 = Player 1 Wins | 🔴 = Player 2 Wins | 🟡 = Tie",
+                text=f"Requested by {interaction.user.display_name} | Ties share a rank",
                 icon_url=interaction.user.display_avatar.url
             )
             
@@ -377,31 +449,81 @@ class PlayerCommands(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         try:
+            uid = normalize_uid(uid)
             if not uid.isdigit() or len(uid) < 8 or len(uid) > 12:
                 await interaction.followup.send("❌ Invalid UID", ephemeral=True)
                 return
             
-            success, data, error = await self.api_client.get_player_info(uid, "IND")
+            success, player, error = await self.api_client.get_player_info(uid, "IND")
             
             if not success:
                 await interaction.followup.send(f"❌ {error}", ephemeral=True)
                 return
             
-            basic_info = data.get('basicInfo', {})
-            
             response = (
-                f"**🎮 {basic_info.get('nickname', 'Unknown')}**\n"
+                f"**🎮 {player.nickname}**\n"
                 f"UID: `{uid}`\n"
-                f"Level: **{basic_info.get('level', 0)}**\n"
-                f"Kills: **{self.formatter.format_number(basic_info.get('kills', 0))}**\n"
-                f"K/D: **{self.formatter.calculate_kd_ratio(basic_info.get('kills', 0), basic_info.get('deaths', 0))}**"
+                f"Level: **{player.level}**\n"
+                f"Kills: **{self.formatter.format_number(player.kills)}**\n"
+                f"K/D: **{self.formatter.calculate_kd_ratio(player.kills, player.deaths)}**"
             )
+            if error:
+                response += f"\n⚠️ *{error}*"
             
             await interaction.followup.send(response, ephemeral=True)
             
         except Exception as e:
             logger.error(f"Error in quick_info: {e}")
             await interaction.followup.send("❌ An error occurred", ephemeral=True)
+    
+    @app_commands.command(name="loadout", description="Show a player's equipped items as one image")
+    @app_commands.describe(uid="Player's UID", region="Region (default: IND)")
+    async def loadout(self, interaction: discord.Interaction, uid: str, region: str = "IND"):
+        """Render a player's outfit and weapon skins into a single icon grid"""
+        
+        await interaction.response.defer()
+        
+        try:
+            region = str(region).upper()
+            uid = normalize_uid(uid)
+            if not uid.isdigit() or len(uid) < 8 or len(uid) > 12:
+                await interaction.followup.send("❌ Invalid UID", ephemeral=True)
+                return
+            
+            success, player, error = await self.api_client.get_player_info(uid, region)
+            if not success:
+                await interaction.followup.send(f"❌ {error}", ephemeral=True)
+                return
+            
+            item_ids = list(player.clothes) + list(player.weapon_skins)
+            if not item_ids:
+                await interaction.followup.send(f"❌ **{player.nickname}** has no equipped items to show.")
+                return
+            
+            # One composed image, so one attachment and one upload
+            success_img, image_data, error_img = await self.api_client.get_item_grid(item_ids[:24])
+            if not success_img:
+                await interaction.followup.send(f"❌ {error_img}", ephemeral=True)
+                return
+            
+            filename = f"loadout_{uid}.{image_extension(image_data)}"
+            embed = discord.Embed(
+                title=f"🎽 Loadout: {player.nickname}",
+                description=f"**UID:** `{uid}` | {len(item_ids)} equipped items",
+                color=discord.Color.blue(),
+                timestamp=datetime.utcnow()
+            )
+            embed.set_image(url=f"attachment://{filename}")
+            embed.set_footer(
+                text=f"Requested by {interaction.user.display_name}",
+                icon_url=interaction.user.display_avatar.url
+            )
+            
+            await interaction.followup.send(embed=embed, file=discord.File(io.BytesIO(image_data), filename=filename))
+            
+        except Exception as e:
+            logger.error(f"Error in loadout command: {e}")
+            await interaction.followup.send("❌ An error occurred", ephemeral=True)
 
 
 async def setup(bot):
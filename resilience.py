@@ -0,0 +1,210 @@
+"""
+Resilience Module for Free Fire Bot
+Rate limiting, retry and circuit breaker helpers for upstream API calls
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Adaptive token-bucket rate limiter for a single upstream host
+
+    The refill rate is halved whenever the host answers 429 and creeps back up
+    towards max_rate on every success (AIMD), so bursts get smoothed out to
+    whatever the host currently tolerates. While the host is blocked by a
+    Retry-After, callers wait only up to their max_wait and otherwise fail
+    fast with RateLimitedError.
+    """
+
+    def __init__(self, rate: float, capacity: float, min_rate: float = 0.5):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+        # Counters
+        self.throttled = 0
+        self.penalties = 0
+        self.rejected = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def blocked_for(self) -> float:
+        """Seconds left on the current Retry-After block"""
+        return max(0.0, self.blocked_until - time.monotonic())
+
+    async def acquire(self, max_wait: Optional[float] = None):
+        """
+        Wait until a request may be sent
+
+        Raises RateLimitedError instead of waiting when the host is blocked for
+        longer than max_wait seconds.
+        """
+        while True:
+            # Blocks are waited out without the lock, so a long Retry-After
+            # never holds up callers that are about to fail fast
+            blocked_for = self.blocked_for()
+            if blocked_for > 0:
+                if max_wait is not None and blocked_for > max_wait:
+                    self.rejected += 1
+                    raise RateLimitedError(blocked_for)
+                self.throttled += 1
+                await asyncio.sleep(blocked_for)
+                continue
+
+            async with self._lock:
+                if self.blocked_for() > 0:
+                    continue
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                # Token waits are short (at most 1 / min_rate) and keep callers in order
+                self.throttled += 1
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def on_success(self):
+        """Additively raise the rate back towards its maximum"""
+        self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None):
+        """Back off after a 429: halve the rate and honour Retry-After"""
+        self._refill()
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0
+        self.penalties += 1
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get current rate and counters"""
+        return {
+            "rate": round(self.rate, 2),
+            "max_rate": self.max_rate,
+            "throttled": self.throttled,
+            "penalties": self.penalties,
+            "rejected": self.rejected,
+            "blocked_for": round(self.blocked_for(), 1)
+        }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds (HTTP dates are ignored)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """Full-jitter exponential backoff delay for a retry attempt (0-based)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class RateLimitedError(Exception):
+    """Raised when a host's Retry-After block outlasts what the caller will wait"""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"Upstream rate limited, retry in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the endpoint's circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a single upstream endpoint
+
+    Opens after failure_threshold consecutive failures so callers fail fast
+    instead of waiting for timeouts. After recovery_timeout seconds it goes
+    half-open and lets up to half_open_max_calls probe requests through; a
+    successful probe closes it again, a failed one re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30, half_open_max_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probes_in_flight = 0
+
+        # Counters
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the timeout passes"""
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._probes_in_flight = 0
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Check whether a request may be sent now"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+            self._probes_in_flight += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        """Close the circuit after a successful request"""
+        self._state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probes_in_flight = 0
+
+    def record_failure(self):
+        """Count a failure, opening the circuit once the threshold is reached"""
+        self.consecutive_failures += 1
+        if self._state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.times_opened += 1
+                logger.warning(f"Circuit opened after {self.consecutive_failures} consecutive failures")
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probes_in_flight = 0
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit will allow a probe"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get current state and counters"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+            "retry_in": round(self.retry_in(), 1)
+        }
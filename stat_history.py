@@ -0,0 +1,181 @@
+"""
+Stat History Module for Free Fire Bot
+Compact time series of tracked players' stats with downsampling tiers
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, List, Tuple
+
+from utils.models import PlayerSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Stats recorded per snapshot, in column order
+SNAPSHOT_FIELDS = ("level", "kills", "deaths", "headshots", "exp", "likes")
+
+# (tier, bucket seconds, seconds kept in this tier before rolling up to the next)
+RETENTION_TIERS = (
+    (0, 0, 2 * 86400),           # every fetch, for 2 days
+    (1, 3600, 30 * 86400),       # hourly, for 30 days
+    (2, 86400, None)             # daily, forever
+)
+
+
+def stats_from_player(player: PlayerSnapshot) -> Dict[str, int]:
+    """Extract the recorded stats from a player snapshot"""
+    return {field: getattr(player, field) for field in SNAPSHOT_FIELDS}
+
+
+class StatHistory:
+    """
+    Append-only stat snapshots per UID, downsampled as they age
+
+    Every fetch of a tracked player appends a raw snapshot (skipped when the
+    stats are unchanged within min_interval). Compaction keeps the last
+    snapshot per hour once raw rows are older than two days, and the last per
+    day once hourly rows are older than 30 days. Stats are cumulative
+    counters, so the last value in a bucket loses nothing for range diffs.
+    """
+
+    def __init__(
+        self,
+        path: str = "data/stat_history.db",
+        min_interval: float = 3600,
+        compact_interval: float = 3600
+    ):
+        self.path = path
+        self.min_interval = min_interval
+        self.compact_interval = compact_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # uid -> (timestamp, stats) of the latest appended snapshot
+        self._last: Dict[str, Tuple[int, Tuple[int, ...]]] = {}
+        # Compact on the first append, however recently the host booted
+        self._last_compaction = float("-inf")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use (called with the lock held)"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS stat_history (
+                    uid TEXT NOT NULL,
+                    tier INTEGER NOT NULL,
+                    ts INTEGER NOT NULL,
+                    {", ".join(f"{field} INTEGER NOT NULL" for field in SNAPSHOT_FIELDS)},
+                    PRIMARY KEY (uid, tier, ts)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _append_sync(self, uid: str, ts: int, values: Tuple[int, ...]):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO stat_history (uid, tier, ts, {', '.join(SNAPSHOT_FIELDS)}) "
+                    f"VALUES (?, 0, ?, {', '.join('?' for _ in SNAPSHOT_FIELDS)})",
+                    (uid, ts) + values
+                )
+
+    def _compact_sync(self) -> int:
+        """Roll aged rows up into the next tier, returning how many rows were folded"""
+        now = int(time.time())
+        folded = 0
+        columns = ", ".join(SNAPSHOT_FIELDS)
+
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                for (tier, _, keep), (next_tier, bucket, _) in zip(RETENTION_TIERS, RETENTION_TIERS[1:]):
+                    cutoff = now - keep
+                    # Last snapshot per (uid, bucket) survives into the next tier
+                    conn.execute(
+                        f"""
+                        INSERT OR REPLACE INTO stat_history (uid, tier, ts, {columns})
+                        SELECT uid, ?, ts, {columns} FROM stat_history AS h
+                        WHERE tier = ? AND ts < ? AND ts = (
+                            SELECT MAX(ts) FROM stat_history
+                            WHERE uid = h.uid AND tier = h.tier AND ts / ? = h.ts / ?
+                        )
+                        """,
+                        (next_tier, tier, cutoff, bucket, bucket)
+                    )
+                    cursor = conn.execute(
+                        "DELETE FROM stat_history WHERE tier = ? AND ts < ?", (tier, cutoff)
+                    )
+                    folded += cursor.rowcount
+                    # Earlier compactions may have left an older row in the same bucket
+                    conn.execute(
+                        """
+                        DELETE FROM stat_history WHERE tier = ? AND EXISTS (
+                            SELECT 1 FROM stat_history AS later
+                            WHERE later.uid = stat_history.uid AND later.tier = stat_history.tier
+                            AND later.ts / ? = stat_history.ts / ? AND later.ts > stat_history.ts
+                        )
+                        """,
+                        (next_tier, bucket, bucket)
+                    )
+        return folded
+
+    def _range_sync(self, uid: str, since: int, until: int) -> List[Tuple[int, ...]]:
+        with self._lock:
+            conn = self._connect()
+            return conn.execute(
+                f"SELECT ts, {', '.join(SNAPSHOT_FIELDS)} FROM stat_history "
+                "WHERE uid = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                (uid, since, until)
+            ).fetchall()
+
+    async def append(self, uid: str, player: PlayerSnapshot, ts: Optional[int] = None):
+        """Record a snapshot of a player's stats"""
+        ts = int(time.time()) if ts is None else ts
+        stats = stats_from_player(player)
+        values = tuple(stats[field] for field in SNAPSHOT_FIELDS)
+
+        last = self._last.get(uid)
+        if last is not None and last[1] == values and ts - last[0] < self.min_interval:
+            return
+        self._last[uid] = (ts, values)
+
+        try:
+            await asyncio.to_thread(self._append_sync, uid, ts, values)
+        except Exception as e:
+            logger.error(f"Error recording stat history for {uid}: {e}")
+            return
+
+        if time.monotonic() - self._last_compaction > self.compact_interval:
+            self._last_compaction = time.monotonic()
+            try:
+                folded = await asyncio.to_thread(self._compact_sync)
+                if folded:
+                    logger.info(f"Compacted {folded} stat history rows")
+            except Exception as e:
+                logger.error(f"Error compacting stat history: {e}")
+
+    async def range(self, uid: str, since: int, until: Optional[int] = None) -> List[Dict[str, int]]:
+        """Snapshots for a UID between two Unix timestamps, oldest first"""
+        until = int(time.time()) if until is None else until
+        rows = await asyncio.to_thread(self._range_sync, uid, since, until)
+        return [dict(zip(("ts",) + SNAPSHOT_FIELDS, row)) for row in rows]
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -5,46 +5,190 @@ Advanced statistics and leaderboard features
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from datetime import datetime
+import asyncio
 import logging
-import json
-import os
-from typing import Dict, List
+import time
+from typing import Dict, List, Optional
 
-from utils.api_client import FFAPIClient, DataFormatter
+from utils.api_client import DataFormatter, get_shared_client, release_shared_client, normalize_uid
+from utils.tracking_store import TrackingStore
+from utils.stat_history import StatHistory
+from utils.leaderboard import LEADERBOARD_METRICS, LeaderboardIndex, leaderboard_values
+from utils.models import PlayerSnapshot
 
 logger = logging.getLogger(__name__)
 
+TRACKED_PAGE_SIZE = 10
+
+
+class TrackedPlayersView(discord.ui.View):
+    """Previous/next buttons for /tracked, paging by rowid cursor"""
+    
+    def __init__(self, cog: "StatsCommands", user_id: str, total: int):
+        super().__init__(timeout=300)
+        self.cog = cog
+        self.user_id = user_id
+        self.total = total
+        self.page_index = 0
+        self.first_cursor: Optional[int] = None
+        self.last_cursor: Optional[int] = None
+    
+    def set_page(self, rows: List, has_prev: bool, has_next: bool):
+        """Remember the cursors of the shown page and enable the buttons that lead somewhere"""
+        if rows:
+            self.first_cursor = rows[0][0]
+            self.last_cursor = rows[-1][0]
+        self.previous_page.disabled = not has_prev
+        self.next_page.disabled = not has_next
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return str(interaction.user.id) == self.user_id
+    
+    @discord.ui.button(label="Previous", emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page_index = max(0, self.page_index - 1)
+        embed, rows, has_more = await self.cog.build_tracked_page(
+            self.user_id, self.total, self.page_index, before=self.first_cursor
+        )
+        self.set_page(rows, has_prev=has_more, has_next=True)
+        await interaction.response.edit_message(embed=embed, view=self)
+    
+    @discord.ui.button(label="Next", emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page_index += 1
+        embed, rows, has_more = await self.cog.build_tracked_page(
+            self.user_id, self.total, self.page_index, after=self.last_cursor
+        )
+        self.set_page(rows, has_prev=True, has_next=has_more)
+        await interaction.response.edit_message(embed=embed, view=self)
+
 
 class StatsCommands(commands.Cog):
     """Advanced statistics and leaderboard commands"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.api_client = FFAPIClient(bot.session)
+        self.api_client = get_shared_client(bot).for_consumer("stats")
         self.formatter = DataFormatter()
-        self.tracked_players_file = "data/tracked_players.json"
-        self.tracked_players = self.load_tracked_players()
+        self.store = TrackingStore(
+            "data/tracked_players.db",
+            legacy_json_path="data/tracked_players.json"
+        )
+        self.history = StatHistory("data/stat_history.db")
+        self.api_client.add_fetch_listener(self.on_player_fetched)
+        
+        # Per-server rankings, updated from every fetch of a tracked player
+        self.leaderboard = LeaderboardIndex()
+        self._leaderboard_loaded = False
+        self._leaderboard_lock = asyncio.Lock()
+        # uid -> (computed_at, kills at the start of the 7-day window)
+        self._week_baselines: Dict[str, tuple] = {}
+        
+        # Background refresh of tracked players, spread over each interval
+        self.refresh_interval = self.api_client.cache_ttls["player_info"]
+        self.refresh_batch_size = 10
+        self.refresh_concurrency = 4
+        self.refresh_stats = {"uids": 0, "fetched": 0, "skipped": 0, "failed": 0, "duration": 0.0}
+        self.refresh_tracked.change_interval(seconds=self.refresh_interval)
+        self.refresh_tracked.start()
+    
+    async def cog_unload(self):
+        self.refresh_tracked.cancel()
+        self.api_client.remove_fetch_listener(self.on_player_fetched)
+        self.store.close()
+        self.history.close()
+        await release_shared_client(self.bot)
+    
+    async def on_player_fetched(self, uid: str, player: PlayerSnapshot):
+        """Record history and update leaderboards whenever a tracked player is fetched"""
+        if await self.store.is_tracked(uid):
+            await self.history.append(uid, player)
+            await self._index_player(uid, player)
+    
+    async def _ensure_leaderboard(self) -> LeaderboardIndex:
+        """Load server memberships of tracked players on first use"""
+        if not self._leaderboard_loaded:
+            async with self._leaderboard_lock:
+                if not self._leaderboard_loaded:
+                    for _, uid, _, guild_id in await self.store.all_pairs():
+                        if guild_id:
+                            self.leaderboard.add_member(guild_id, uid)
+                    self._leaderboard_loaded = True
+        return self.leaderboard
+    
+    async def _week_baseline(self, uid: str) -> Optional[int]:
+        """Kills at the oldest snapshot of the last 7 days, re-read at most hourly"""
+        cached = self._week_baselines.get(uid)
+        if cached is not None and time.time() - cached[0] < 3600:
+            return cached[1]
+        snapshots = await self.history.range(uid, int(time.time()) - 7 * 86400)
+        baseline = snapshots[0]['kills'] if snapshots else None
+        self._week_baselines[uid] = (time.time(), baseline)
+        return baseline
     
-    def load_tracked_players(self) -> Dict:
-        """Load tracked players from file"""
-        if os.path.exists(self.tracked_players_file):
-            try:
-                with open(self.tracked_players_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Error loading tracked players: {e}")
-        return {}
+    async def _index_player(self, uid: str, player: PlayerSnapshot):
+        """Reposition a player in the rankings of every server tracking it"""
+        leaderboard = await self._ensure_leaderboard()
+        if not leaderboard.is_ranked(uid):
+            return
+        values = leaderboard_values(player, await self._week_baseline(uid))
+        leaderboard.update_player(uid, player.nickname, values)
     
-    def save_tracked_players(self):
-        """Save tracked players to file"""
+    @tasks.loop(seconds=300)
+    async def refresh_tracked(self):
+        """Refresh every tracked UID once per interval so commands hit a warm cache"""
+        # tasks.loop stops for good on exceptions it does not retry, e.g. a locked database
         try:
-            os.makedirs(os.path.dirname(self.tracked_players_file), exist_ok=True)
-            with open(self.tracked_players_file, 'w') as f:
-                json.dump(self.tracked_players, f, indent=2)
+            await self._refresh_tracked_once()
         except Exception as e:
-            logger.error(f"Error saving tracked players: {e}")
+            logger.error(f"Error refreshing tracked players: {e}", exc_info=True)
+    
+    async def _refresh_tracked_once(self):
+        # Distinct UIDs from the subscriber index, so shared UIDs are fetched once
+        uids = await self.store.tracked_uids()
+        if not uids:
+            return
+        
+        started = time.monotonic()
+        stats = {"uids": len(uids), "fetched": 0, "skipped": 0, "failed": 0}
+        semaphore = asyncio.Semaphore(self.refresh_concurrency)
+        
+        async def refresh_one(uid: str):
+            async with semaphore:
+                # Entries refreshed recently (e.g. by a command) are left alone
+                was_cached = self.api_client.is_player_cached(uid, min_remaining=self.refresh_interval / 2)
+                try:
+                    success, _, _ = await self.api_client.refresh_player_info(
+                        uid,
+                        min_remaining=self.refresh_interval / 2
+                    )
+                except Exception as e:
+                    logger.error(f"Error refreshing tracked player {uid}: {e}")
+                    success = False
+                if not success:
+                    stats["failed"] += 1
+                elif was_cached:
+                    stats["skipped"] += 1
+                else:
+                    stats["fetched"] += 1
+        
+        # Spread batches over most of the interval to avoid bursts upstream
+        batches = [uids[i:i + self.refresh_batch_size] for i in range(0, len(uids), self.refresh_batch_size)]
+        spacing = self.refresh_interval * 0.8 / len(batches)
+        for batch in batches:
+            batch_started = time.monotonic()
+            await asyncio.gather(*(refresh_one(uid) for uid in batch))
+            await asyncio.sleep(max(0.0, spacing - (time.monotonic() - batch_started)))
+        
+        stats["duration"] = round(time.monotonic() - started, 1)
+        self.refresh_stats = stats
+        logger.info(f"Refreshed tracked players: {stats}")
+    
+    @refresh_tracked.before_loop
+    async def before_refresh_tracked(self):
+        await self.bot.wait_until_ready()
     
     @app_commands.command(name="track", description="Track a player's statistics")
     @app_commands.describe(
@@ -66,49 +210,55 @@ class StatsCommands(commands.Cog):
             region = str(region).upper()
             
             # Validate UID
+            uid = normalize_uid(uid)
             if not uid.isdigit() or len(uid) < 8 or len(uid) > 12:
                 await interaction.followup.send("❌ Invalid UID", ephemeral=True)
                 return
             
             # Fetch player to verify
-            success, data, error = await self.api_client.get_player_info(uid, region)
+            success, player, error = await self.api_client.get_player_info(uid, region)
             
             if not success:
                 await interaction.followup.send(f"❌ {error}", ephemeral=True)
                 return
             
-            basic_info = data.get('basicInfo', {})
             user_id = str(interaction.user.id)
+            guild_id = str(interaction.guild_id) if interaction.guild_id else None
             
-            # Initialize user's tracking list
-            if user_id not in self.tracked_players:
-                self.tracked_players[user_id] = {}
+            # Re-tracking replaces the old row, so drop its server membership first
+            leaderboard = await self._ensure_leaderboard()
+            previous = await self.store.get(user_id, uid)
+            if previous and previous.get('guild_id'):
+                leaderboard.remove_member(previous['guild_id'], uid)
             
             # Add player to tracking
-            self.tracked_players[user_id][uid] = {
-                "nickname": basic_info.get('nickname', 'Unknown'),
+            await self.store.put(user_id, uid, {
+                "nickname": player.nickname,
                 "region": region,
+                "guild_id": guild_id,
                 "added_at": datetime.utcnow().isoformat(),
                 "initial_stats": {
-                    "level": basic_info.get('level', 0),
-                    "kills": basic_info.get('kills', 0),
-                    "deaths": basic_info.get('deaths', 0)
+                    "level": player.level,
+                    "kills": player.kills,
+                    "deaths": player.deaths
                 }
-            }
-            
-            self.save_tracked_players()
+            })
+            await self.history.append(uid, player)
+            if guild_id:
+                leaderboard.add_member(guild_id, uid)
+                await self._index_player(uid, player)
             
             embed = discord.Embed(
                 title="✅ Player Tracked",
-                description=f"Now tracking **{basic_info.get('nickname', 'Unknown')}** (`{uid}`)",
+                description=f"Now tracking **{player.nickname}** (`{uid}`)",
                 color=discord.Color.green()
             )
             embed.add_field(
                 name="📊 Current Stats",
                 value=(
-                    f"Level: **{basic_info.get('level', 0)}**\n"
-                    f"Kills: **{self.formatter.format_number(basic_info.get('kills', 0))}**\n"
-                    f"K/D: **{self.formatter.calculate_kd_ratio(basic_info.get('kills', 0), basic_info.get('deaths', 0))}**"
+                    f"Level: **{player.level}**\n"
+                    f"Kills: **{self.formatter.format_number(player.kills)}**\n"
+                    f"K/D: **{self.formatter.calculate_kd_ratio(player.kills, player.deaths)}**"
                 )
             )
             
@@ -127,37 +277,87 @@ class StatsCommands(commands.Cog):
     ):
         """Remove a player from tracking list"""
         
+        uid = normalize_uid(uid)
         user_id = str(interaction.user.id)
         
-        if user_id not in self.tracked_players or uid not in self.tracked_players[user_id]:
+        removed = await self.store.remove(user_id, uid)
+        
+        if removed is None:
             await interaction.response.send_message(
                 "❌ You are not tracking this player.",
                 ephemeral=True
             )
             return
         
-        player_name = self.tracked_players[user_id][uid].get('nickname', 'Unknown')
-        del self.tracked_players[user_id][uid]
-        
-        if not self.tracked_players[user_id]:
-            del self.tracked_players[user_id]
+        if removed.get('guild_id'):
+            (await self._ensure_leaderboard()).remove_member(removed['guild_id'], uid)
         
-        self.save_tracked_players()
+        player_name = removed.get('nickname', 'Unknown')
         
         await interaction.response.send_message(
             f"✅ Stopped tracking **{player_name}** (`{uid}`)",
             ephemeral=True
         )
     
+    async def build_tracked_page(
+        self,
+        user_id: str,
+        total: int,
+        page_index: int,
+        after: Optional[int] = None,
+        before: Optional[int] = None
+    ):
+        """
+        Build one /tracked page
+
+        Returns:
+            Tuple[embed, rows, has_more] where has_more tells whether another
+            page exists in the direction that was paged
+        """
+        rows = await self.store.page(user_id, after=after, before=before, limit=TRACKED_PAGE_SIZE + 1)
+        has_more = len(rows) > TRACKED_PAGE_SIZE
+        if has_more:
+            # The extra row only tells that another page exists
+            rows = rows[1:] if before is not None else rows[:TRACKED_PAGE_SIZE]
+        
+        pages = max(1, -(-total // TRACKED_PAGE_SIZE))
+        embed = discord.Embed(
+            title="📊 Your Tracked Players",
+            description=f"Tracking {total} player(s)",
+            color=discord.Color.blue(),
+            timestamp=datetime.utcnow()
+        )
+        
+        for _, uid, player_data in rows:
+            nickname = player_data.get('nickname', 'Unknown')
+            region = player_data.get('region', 'IND')
+            added_at = player_data.get('added_at', 'Unknown')
+            value = f"UID: `{uid}`\nRegion: {region}\nAdded: {added_at[:10]}"
+            
+            # Live stats only if already cached; paging never goes upstream
+            cached = self.api_client.peek_player_info(uid)
+            if cached is not None:
+                value += (
+                    f"\nLevel **{cached.level}** • "
+                    f"Kills **{self.formatter.format_number(cached.kills)}** • "
+                    f"K/D **{self.formatter.calculate_kd_ratio(cached.kills, cached.deaths)}**"
+                )
+            
+            embed.add_field(name=f"🎮 {nickname}", value=value, inline=False)
+        
+        embed.set_footer(text=f"Page {page_index + 1}/{pages}")
+        return embed, rows, has_more
+    
     @app_commands.command(name="tracked", description="View your tracked players")
     async def view_tracked(self, interaction: discord.Interaction):
-        """View all tracked players"""
+        """View tracked players, one page at a time"""
         
         await interaction.response.defer(ephemeral=True)
         
         user_id = str(interaction.user.id)
+        total = await self.store.count(user_id)
         
-        if user_id not in self.tracked_players or not self.tracked_players[user_id]:
+        if not total:
             embed = discord.Embed(
                 title="📊 Tracked Players",
                 description="You are not tracking any players.\nUse `/track <uid>` to start tracking.",
@@ -166,66 +366,120 @@ class StatsCommands(commands.Cog):
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
         
+        embed, rows, has_more = await self.build_tracked_page(user_id, total, 0)
+        
+        if not has_more:
+            await interaction.followup.send(embed=embed, ephemeral=True)
+            return
+        
+        view = TrackedPlayersView(self, user_id, total)
+        view.set_page(rows, has_prev=False, has_next=True)
+        await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+    
+    @app_commands.command(name="leaderboard", description="Top tracked players in this server")
+    @app_commands.describe(
+        metric="Stat to rank by",
+        limit="Number of players to show (default: 10)"
+    )
+    @app_commands.choices(metric=[
+        app_commands.Choice(name=name, value=key) for key, name in LEADERBOARD_METRICS.items()
+    ])
+    @app_commands.guild_only()
+    async def leaderboard_command(
+        self,
+        interaction: discord.Interaction,
+        metric: str = "kills",
+        limit: app_commands.Range[int, 1, 25] = 10
+    ):
+        """Rank this server's tracked players from the in-memory index"""
+        
+        guild_id = str(interaction.guild_id)
+        leaderboard = await self._ensure_leaderboard()
+        top = leaderboard.top(guild_id, metric, limit)
+        
         embed = discord.Embed(
-            title="📊 Your Tracked Players",
-            description=f"Tracking {len(self.tracked_players[user_id])} player(s)",
-            color=discord.Color.blue(),
+            title=f"🏆 Leaderboard: {LEADERBOARD_METRICS[metric]}",
+            color=discord.Color.gold(),
             timestamp=datetime.utcnow()
         )
         
-        for uid, player_data in list(self.tracked_players[user_id].items())[:10]:
-            nickname = player_data.get('nickname', 'Unknown')
-            region = player_data.get('region', 'IND')
-            added_at = player_data.get('added_at', 'Unknown')
-            
-            embed.add_field(
-                name=f"🎮 {nickname}",
-                value=f"UID: `{uid}`\nRegion: {region}\nAdded: {added_at[:10]}",
-                inline=False
+        if not top:
+            embed.description = (
+                "No tracked players with stats in this server yet.\n"
+                "Use `/track <uid>` here to add players."
             )
+            await interaction.response.send_message(embed=embed)
+            return
         
-        if len(self.tracked_players[user_id]) > 10:
-            embed.set_footer(text=f"Showing 10 of {len(self.tracked_players[user_id])} tracked players")
+        medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+        lines = []
+        for rank, (uid, nickname, value) in enumerate(top, start=1):
+            if metric == "kd":
+                shown = f"{value:.2f}"
+            elif metric == "kills_week":
+                shown = f"+{self.formatter.format_number(int(value))}"
+            else:
+                shown = self.formatter.format_number(int(value))
+            lines.append(f"{medals.get(rank, f'`#{rank}`')} **{nickname}** (`{uid}`) — **{shown}**")
+        embed.description = "\n".join(lines)
+        
+        embed.set_footer(
+            text=f"{leaderboard.ranked_count(guild_id)} of {leaderboard.member_count(guild_id)} "
+                 f"tracked players ranked • Updated as stats are fetched"
+        )
         
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        await interaction.response.send_message(embed=embed)
     
     @app_commands.command(name="progress", description="Check progress of a tracked player")
-    @app_commands.describe(uid="Player's UID")
+    @app_commands.describe(
+        uid="Player's UID",
+        days="Only count progress from the last N days (default: since tracking started)"
+    )
     async def check_progress(
         self,
         interaction: discord.Interaction,
-        uid: str
+        uid: str,
+        days: Optional[app_commands.Range[int, 1, 365]] = None
     ):
         """Check a tracked player's progress"""
         
         await interaction.response.defer(ephemeral=True)
         
+        uid = normalize_uid(uid)
         user_id = str(interaction.user.id)
+        player_data = await self.store.get(user_id, uid)
         
-        if user_id not in self.tracked_players or uid not in self.tracked_players[user_id]:
+        if player_data is None:
             await interaction.followup.send(
                 "❌ You are not tracking this player. Use `/track` first.",
                 ephemeral=True
             )
             return
         
-        player_data = self.tracked_players[user_id][uid]
         region = player_data.get('region', 'IND')
         
         # Fetch current stats
-        success, data, error = await self.api_client.get_player_info(uid, region)
+        success, player, error = await self.api_client.get_player_info(uid, region)
         
         if not success:
             await interaction.followup.send(f"❌ {error}", ephemeral=True)
             return
         
-        basic_info = data.get('basicInfo', {})
         initial_stats = player_data.get('initial_stats', {})
+        since_text = f"Tracked since: {player_data.get('added_at', 'Unknown')[:10]}"
+        
+        # With a window, diff against the oldest recorded snapshot inside it
+        snapshots = []
+        if days:
+            snapshots = await self.history.range(uid, int(time.time()) - days * 86400)
+            if snapshots:
+                initial_stats = snapshots[0]
+                since_text = f"Last {days} day(s), since {datetime.utcfromtimestamp(snapshots[0]['ts']).strftime('%Y-%m-%d %H:%M')} UTC"
         
         # Calculate differences
-        current_level = basic_info.get('level', 0)
-        current_kills = basic_info.get('kills', 0)
-        current_deaths = basic_info.get('deaths', 0)
+        current_level = player.level
+        current_kills = player.kills
+        current_deaths = player.deaths
         
         initial_level = initial_stats.get('level', 0)
         initial_kills = initial_stats.get('kills', 0)
@@ -237,8 +491,8 @@ class StatsCommands(commands.Cog):
         
         # Create progress embed
         embed = discord.Embed(
-            title=f"📈 Progress: {basic_info.get('nickname', 'Unknown')}",
-            description=f"UID: `{uid}` | Tracked since: {player_data.get('added_at', 'Unknown')[:10]}",
+            title=f"📈 Progress: {player.nickname}",
+            description=f"UID: `{uid}` | {since_text}",
             color=discord.Color.green(),
             timestamp=datetime.utcnow()
         )
@@ -266,10 +520,133 @@ class StatsCommands(commands.Cog):
             inline=True
         )
         
+        # Kills gained per day, from the last snapshot of each day
+        if len(snapshots) > 1:
+            day_ends = {}
+            for snapshot in snapshots:
+                day_ends[datetime.utcfromtimestamp(snapshot['ts']).date()] = snapshot['kills']
+            daily_lines = []
+            previous_kills = snapshots[0]['kills']
+            for day, kills in sorted(day_ends.items()):
+                daily_lines.append(f"`{day}` +{self.formatter.format_number(kills - previous_kills)}")
+                previous_kills = kills
+            embed.add_field(
+                name="📅 Kills per Day",
+                value="\n".join(daily_lines[-7:]),
+                inline=False
+            )
+        
         embed.set_footer(text=f"Requested by {interaction.user.display_name}")
         
         await interaction.followup.send(embed=embed, ephemeral=True)
     
+    def build_progress_table(
+        self,
+        tracked: Dict[str, Dict],
+        results: Dict[str, PlayerSnapshot],
+        done: bool
+    ) -> discord.Embed:
+        """Aggregated /progress-all embed from the players fetched so far"""
+        rows = []
+        for uid, player in results.items():
+            initial_stats = tracked[uid].get('initial_stats', {})
+            rows.append((
+                player.kills - initial_stats.get('kills', 0),
+                player.nickname,
+                player.level - initial_stats.get('level', 0),
+                player.kills,
+                self.formatter.calculate_kd_ratio(player.kills, player.deaths)
+            ))
+        rows.sort(key=lambda row: row[0], reverse=True)
+        
+        lines = [f"{'Player':<14}{'Lvl':>5}{'Kills':>9}{'+Kills':>8}{'K/D':>7}"]
+        for kills_diff, nickname, level_diff, kills, kd in rows:
+            lines.append(
+                f"{nickname[:13]:<14}{f'{level_diff:+}':>5}{self.formatter.format_number(kills):>9}"
+                f"{f'{kills_diff:+}':>8}{kd:>7}"
+            )
+        
+        # Stay inside Discord's description limit
+        shown = len(lines)
+        while len("\n".join(lines[:shown])) > 3900:
+            shown -= 1
+        table = "\n".join(lines[:shown])
+        if shown < len(lines):
+            table += f"\n…and {len(lines) - shown} more"
+        
+        embed = discord.Embed(
+            title="📈 Progress: All Tracked Players",
+            description=f"```\n{table}\n```",
+            color=discord.Color.green() if done else discord.Color.orange(),
+            timestamp=datetime.utcnow()
+        )
+        
+        failed = len(tracked) - len(results) if done else 0
+        status = f"{len(results)}/{len(tracked)} loaded"
+        if failed:
+            status += f" • {failed} failed"
+        elif not done:
+            status += " • loading…"
+        embed.add_field(
+            name="📊 Totals",
+            value=(
+                f"Kills gained: **{self.formatter.format_number(sum(row[0] for row in rows))}**\n"
+                f"Levels gained: **{sum(row[2] for row in rows)}**"
+            ),
+            inline=True
+        )
+        embed.set_footer(text=status)
+        return embed
+    
+    @app_commands.command(name="progress-all", description="Check progress of all your tracked players")
+    async def check_progress_all(self, interaction: discord.Interaction):
+        """Fetch every tracked player concurrently and show one aggregated table"""
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        user_id = str(interaction.user.id)
+        tracked = dict(await self.store.get_user(user_id))
+        
+        if not tracked:
+            await interaction.followup.send(
+                "❌ You are not tracking any players. Use `/track` first.",
+                ephemeral=True
+            )
+            return
+        
+        semaphore = asyncio.Semaphore(self.refresh_concurrency)
+        
+        async def fetch(uid: str, region: str):
+            # Cache hits return at once, so the slots mostly bound upstream fetches
+            async with semaphore:
+                return uid, await self.api_client.get_player_info(uid, region)
+        
+        pending = [
+            asyncio.ensure_future(fetch(uid, player.get('region', 'IND')))
+            for uid, player in tracked.items()
+        ]
+        results: Dict[str, PlayerSnapshot] = {}
+        last_edit = time.monotonic()
+        
+        try:
+            for next_done in asyncio.as_completed(pending):
+                uid, (success, player, _) = await next_done
+                if success:
+                    results[uid] = player
+                
+                # Stream partial tables, throttled to stay clear of edit rate limits
+                if time.monotonic() - last_edit > 1.5 and len(results) < len(tracked):
+                    last_edit = time.monotonic()
+                    await interaction.edit_original_response(
+                        embed=self.build_progress_table(tracked, results, done=False)
+                    )
+        except Exception as e:
+            logger.error(f"Error in check_progress_all: {e}")
+            for task in pending:
+                task.cancel()
+        
+        await interaction.edit_original_response(embed=self.build_progress_table(tracked, results, done=True))
+    
     @app_commands.command(name="cache", description="View cache statistics")
     async def cache_stats(self, interaction: discord.Interaction):
         """View API cache statistics"""
@@ -301,11 +678,166 @@ class StatsCommands(commands.Cog):
         )
         
         embed.add_field(
-            name="⏱️ Cache TTL",
-            value=f"**{stats['cache_ttl']}** seconds",
+            name="🗃️ Memory",
+            value=f"**{stats['total_bytes'] / 1024 / 1024:.1f}**/{stats['max_bytes'] / 1024 / 1024:.0f} MB",
+            inline=True
+        )
+        
+        embed.add_field(
+            name="♻️ Evictions",
+            value=f"**{stats['evictions']}** LRU / **{stats['expirations']}** expired",
+            inline=True
+        )
+        
+        embed.add_field(
+            name="🔗 Coalesced Requests",
+            value=f"**{stats['coalesced_requests']}** ({stats['inflight_requests']} in flight)",
+            inline=True
+        )
+        
+        embed.add_field(
+            name="🕰️ Stale Served",
+            value=f"**{stats['stale_served']}** revalidating / **{stats['stale_on_error']}** on error",
+            inline=True
+        )
+        
+        if 'disk' in stats:
+            disk = stats['disk']
+            embed.add_field(
+                name="💽 Disk Tier",
+                value=(
+                    f"**{disk['entries']}** entries, {disk['total_bytes'] / 1024 / 1024:.1f}/"
+                    f"{disk['max_bytes'] / 1024 / 1024:.0f} MB\n"
+                    f"{disk['hits']} hits / {disk['misses']} misses"
+                ),
+                inline=True
+            )
+        
+        if stats['rate_limits']:
+            limiter_lines = [
+                f"**{host.split('.')[0]}:** {limiter['rate']}/{limiter['max_rate']} req/s, "
+                f"{limiter['penalties']} × 429"
+                + (f", blocked {limiter['blocked_for']:g}s" if limiter['blocked_for'] else "")
+                for host, limiter in stats['rate_limits'].items()
+            ]
+            limiter_lines.append(f"Retries: **{stats['retries']}**")
+            embed.add_field(
+                name="🚦 Upstream Rate Limits",
+                value="\n".join(limiter_lines),
+                inline=False
+            )
+        
+        if stats['circuit_breakers']:
+            state_emojis = {"closed": "🟢", "half_open": "🟡", "open": "🔴"}
+            breaker_lines = []
+            for endpoint, breaker in stats['circuit_breakers'].items():
+                line = f"{state_emojis.get(breaker['state'], '⚪')} **{endpoint}:** {breaker['state']}"
+                if breaker['state'] == "open":
+                    line += f" (probe in {breaker['retry_in']:g}s, {breaker['rejected']} rejected)"
+                breaker_lines.append(line)
+            embed.add_field(
+                name="🔌 Circuit Breakers",
+                value="\n".join(breaker_lines),
+                inline=False
+            )
+        
+        if stats.get('images', {}).get('enabled'):
+            images = stats['images']
+            saved = images['bytes_in'] - images['bytes_out']
+            embed.add_field(
+                name="🖼️ Image Pipeline",
+                value=(
+                    f"**{images['processed']}** re-encoded to {images['format']}, "
+                    f"{saved / 1024 / 1024:.1f} MB saved\n"
+                    f"{images['skipped']} kept as fetched / {images['failed']} failed"
+                ),
+                inline=True
+            )
+        
+        ttl_lines = [
+            f"**{endpoint}:** {'never expires' if ttl == float('inf') else f'{ttl:g}s'} "
+            f"({stats['entries_by_endpoint'].get(endpoint, 0)} cached)"
+            for endpoint, ttl in stats['cache_ttls'].items()
+        ]
+        embed.add_field(
+            name="⏱️ Cache TTL / Entries",
+            value="\n".join(ttl_lines) or f"**{stats['cache_ttl']}** seconds",
+            inline=True
+        )
+        
+        refresh = self.refresh_stats
+        embed.add_field(
+            name="🔄 Tracked Refresh",
+            value=(
+                f"Every **{self.refresh_interval:g}s**: {refresh['uids']} UIDs, "
+                f"{refresh['fetched']} fetched / {refresh['skipped']} fresh / {refresh['failed']} failed "
+                f"in {refresh['duration']:g}s"
+            ),
             inline=False
         )
         
+        # Per-cog hit/miss attribution on the shared client
+        if stats['consumers']:
+            consumer_lines = []
+            for name, counts in sorted(stats['consumers'].items()):
+                lookups = counts['hits'] + counts['misses']
+                hit_rate = (counts['hits'] / lookups * 100) if lookups else 0
+                consumer_lines.append(
+                    f"**{name}:** {counts['hits']} hits / {counts['misses']} misses ({hit_rate:.0f}%)"
+                )
+            embed.add_field(
+                name="🧩 By Cog",
+                value="\n".join(consumer_lines),
+                inline=False
+            )
+        
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+    
+    @app_commands.command(name="invalidate", description="Clear cached API data (bot owner only)")
+    @app_commands.describe(
+        uid="Only clear data for this player's UID",
+        endpoint="Only clear data from this endpoint"
+    )
+    @app_commands.choices(endpoint=[
+        app_commands.Choice(name="Player info", value="player_info"),
+        app_commands.Choice(name="Outfit images", value="outfit_image"),
+        app_commands.Choice(name="Item icons", value="item_icon"),
+        app_commands.Choice(name="Item grids", value="item_grid"),
+    ])
+    @app_commands.default_permissions(administrator=True)
+    async def invalidate_cache(
+        self,
+        interaction: discord.Interaction,
+        uid: Optional[str] = None,
+        endpoint: Optional[str] = None
+    ):
+        """Invalidate API cache entries by UID and/or endpoint"""
+        
+        # The cache is shared by every server, so server admin rights are not enough
+        if not await interaction.client.is_owner(interaction.user):
+            await interaction.response.send_message("❌ Only the bot owner can clear the cache", ephemeral=True)
+            return
+        
+        if uid is not None:
+            uid = normalize_uid(uid)
+            if not uid.isdigit():
+                await interaction.response.send_message("❌ Invalid UID", ephemeral=True)
+                return
+        
+        removed = self.api_client.invalidate(endpoint=endpoint, uid=uid)
+        
+        scope = []
+        if endpoint:
+            scope.append(f"endpoint `{endpoint}`")
+        if uid:
+            scope.append(f"UID `{uid}`")
+        
+        embed = discord.Embed(
+            title="🧹 Cache Invalidated",
+            description=f"Removed **{removed}** cached entries for {' and '.join(scope) or 'everything'}",
+            color=discord.Color.green(),
+            timestamp=datetime.utcnow()
+        )
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
 
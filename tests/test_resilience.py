@@ -0,0 +1,128 @@
+"""
+Resilience Tests for Free Fire Bot
+Rate limiter behaviour under long Retry-After blocks
+"""
+
+import asyncio
+import json
+import time
+import unittest
+
+from utils.api_client import FFAPIClient
+from utils.resilience import TokenBucket, RateLimitedError
+
+
+class FakeResponse:
+    def __init__(self, status, body, headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read(self):
+        return self.body.encode()
+
+    async def text(self):
+        return self.body
+
+
+class FakeSession:
+    """Answers GETs from a handler and counts them"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls = 0
+        self.closed = False
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return self.handler(url)
+
+    async def close(self):
+        self.closed = True
+
+
+def player_payload(nickname):
+    return json.dumps({"basicInfo": {"nickname": nickname, "level": 60}})
+
+
+class TokenBucketTests(unittest.IsolatedAsyncioTestCase):
+    async def test_long_block_fails_fast(self):
+        bucket = TokenBucket(rate=5, capacity=5)
+        bucket.on_rate_limited(120)
+        started = time.monotonic()
+        with self.assertRaises(RateLimitedError) as ctx:
+            await bucket.acquire(max_wait=10)
+        self.assertLess(time.monotonic() - started, 0.1)
+        self.assertGreater(ctx.exception.retry_in, 100)
+        self.assertEqual(bucket.rejected, 1)
+
+    async def test_long_block_does_not_hold_the_lock(self):
+        bucket = TokenBucket(rate=5, capacity=5)
+        bucket.on_rate_limited(120)
+        # A caller willing to wait must not keep others from failing fast
+        patient = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0)
+        self.assertFalse(bucket._lock.locked())
+        with self.assertRaises(RateLimitedError):
+            await asyncio.wait_for(bucket.acquire(max_wait=10), timeout=0.5)
+        patient.cancel()
+
+    async def test_short_block_is_waited_out(self):
+        bucket = TokenBucket(rate=5, capacity=5)
+        bucket.on_rate_limited(0.2)
+        started = time.monotonic()
+        await bucket.acquire(max_wait=10)
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+
+
+class ClientRateLimitTests(unittest.IsolatedAsyncioTestCase):
+    async def test_other_uids_fail_fast_after_long_retry_after(self):
+        def handler(url):
+            return FakeResponse(429, "Too Many Requests", {"Retry-After": "120"})
+
+        session = FakeSession(handler)
+        client = FFAPIClient(session, max_retry_after=10)
+
+        success, _, error = await asyncio.wait_for(client.get_player_info("12345678"), timeout=1)
+        self.assertFalse(success)
+        self.assertIn("Rate limit", error)
+
+        # The host is blocked: a different UID fails without waiting or calling upstream
+        started = time.monotonic()
+        success, _, error = await asyncio.wait_for(client.get_player_info("87654321"), timeout=1)
+        self.assertFalse(success)
+        self.assertIn("Rate limit", error)
+        self.assertLess(time.monotonic() - started, 0.1)
+        self.assertEqual(session.calls, 1)
+
+    async def test_stale_player_served_while_blocked(self):
+        responses = [FakeResponse(200, player_payload("Cached"))]
+
+        def handler(url):
+            if responses:
+                return responses.pop(0)
+            return FakeResponse(429, "Too Many Requests", {"Retry-After": "120"})
+
+        session = FakeSession(handler)
+        client = FFAPIClient(session, max_retry_after=10, cache_ttls={"player_info": 0.05}, stale_if_error=60)
+
+        success, player, _ = await client.get_player_info("12345678")
+        self.assertTrue(success)
+        await asyncio.sleep(0.1)
+
+        # First refresh hits the 429, the next is refused locally; both serve the stale copy
+        for _ in range(2):
+            success, player, _ = await asyncio.wait_for(client.get_player_info("12345678"), timeout=1)
+            self.assertTrue(success)
+            self.assertEqual(player.nickname, "Cached")
+        self.assertEqual(session.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Stat History Tests for Free Fire Bot
+Compaction of aged snapshots into hourly and daily tiers
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from utils.models import PlayerSnapshot
+from utils.stat_history import StatHistory
+
+HOUR = 3600
+DAY = 86400
+
+
+def snapshot(kills):
+    return PlayerSnapshot.from_payload("12345678", {"basicInfo": {"nickname": "Tester", "kills": kills}})
+
+
+class StatHistoryCompactionTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "stat_history.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def rows(self, history):
+        with history._lock:
+            return history._connect().execute(
+                "SELECT tier, ts, kills FROM stat_history ORDER BY ts"
+            ).fetchall()
+
+    async def test_first_append_compacts_on_recently_booted_host(self):
+        history = StatHistory(self.path)
+        aged = int(time.time()) - 3 * DAY
+        # A monotonic clock that started minutes ago must not delay the first compaction
+        with mock.patch("utils.stat_history.time.monotonic", return_value=120.0):
+            await history.append("12345678", snapshot(100), ts=aged)
+        self.assertEqual([row[0] for row in self.rows(history)], [1])
+        history.close()
+
+    async def test_aged_rows_roll_up_per_bucket(self):
+        history = StatHistory(self.path, compact_interval=0)
+        now = int(time.time())
+        hour_start = (now - 3 * DAY) // HOUR * HOUR
+        day_start = (now - 40 * DAY) // DAY * DAY
+
+        # Three raw rows in one hour three days ago, three in one day forty days ago
+        kills = 0
+        for start, step in ((day_start, 2 * HOUR), (hour_start, 600)):
+            for offset in range(3):
+                kills += 10
+                await history.append("12345678", snapshot(kills), ts=start + offset * step)
+        # A recent row stays raw
+        await history.append("12345678", snapshot(kills + 10), ts=now - HOUR)
+
+        self.assertEqual(
+            self.rows(history),
+            [
+                (2, day_start + 4 * HOUR, 30),
+                (1, hour_start + 1200, 60),
+                (0, now - HOUR, 70)
+            ]
+        )
+        history.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,308 @@
+"""
+Tracking Store Module for Free Fire Bot
+SQLite-backed storage for players tracked with /track
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+from typing import Optional, Dict, List, Set, Tuple
+
+from utils import json_codec
+from utils.models import normalize_uid
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriberIndex:
+    """
+    Reverse index of tracked UIDs
+
+    Maps uid -> set of user IDs tracking it, so "is X tracked" and "which
+    UIDs to poll" are answered without scanning every user's list.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[str]] = {}
+
+    def add(self, user_id: str, uid: str):
+        """Record that a user tracks a UID"""
+        self._subscribers.setdefault(uid, set()).add(user_id)
+
+    def remove(self, user_id: str, uid: str):
+        """Record that a user stopped tracking a UID"""
+        subscribers = self._subscribers.get(uid)
+        if subscribers is None:
+            return
+        subscribers.discard(user_id)
+        if not subscribers:
+            del self._subscribers[uid]
+
+    def rebuild(self, pairs: List[Tuple[str, ...]]):
+        """Rebuild from (user_id, uid, ...) rows"""
+        self._subscribers.clear()
+        for user_id, uid, *_ in pairs:
+            self.add(user_id, uid)
+
+    def is_tracked(self, uid: str) -> bool:
+        return uid in self._subscribers
+
+    def uids(self) -> List[str]:
+        return list(self._subscribers)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+
+class TrackingStore:
+    """
+    Per-row persistence for tracked players
+
+    Each (user, uid) pair is its own row in a WAL-mode SQLite database, so a
+    /track or /untrack writes only that row in a single atomic transaction.
+    Users' lists are loaded on first access and kept in memory afterwards,
+    while a SubscriberIndex over all users is built once from the user_id/uid
+    columns and kept in step with every put and remove. All database work
+    runs in a worker thread.
+    """
+
+    def __init__(self, path: str = "data/tracked_players.db", legacy_json_path: Optional[str] = None):
+        self.path = path
+        self.legacy_json_path = legacy_json_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # user_id -> uid -> player data, for users loaded so far
+        self._users: Dict[str, Dict[str, Dict]] = {}
+        self.index = SubscriberIndex()
+        self._index_loaded = False
+        self._index_lock = asyncio.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use (called with the lock held)"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tracked_players (
+                    user_id TEXT NOT NULL,
+                    uid TEXT NOT NULL,
+                    region TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    guild_id TEXT,
+                    PRIMARY KEY (user_id, uid)
+                )
+                """
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(tracked_players)")}
+            if "guild_id" not in columns:
+                # Databases created before leaderboards had no server column
+                conn.execute("ALTER TABLE tracked_players ADD COLUMN guild_id TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tracked_uid ON tracked_players(uid)")
+            conn.commit()
+            self._conn = conn
+            self._migrate_legacy_json(conn)
+            self._normalize_uids(conn)
+        return self._conn
+
+    def _migrate_legacy_json(self, conn: sqlite3.Connection):
+        """
+        Import the old tracked_players.json once, then move it aside
+
+        UIDs are normalized on the way in; when a user has the same player
+        under several spellings the first one listed is kept.
+        """
+        if not self.legacy_json_path or not os.path.exists(self.legacy_json_path):
+            return
+
+        try:
+            with open(self.legacy_json_path, 'rb') as f:
+                legacy = json_codec.loads(f.read())
+            rows = [
+                (user_id, normalize_uid(uid), player.get('region', 'IND'), json_codec.dumps(player))
+                for user_id, players in legacy.items()
+                for uid, player in players.items()
+            ]
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO tracked_players (user_id, uid, region, data) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+            os.replace(self.legacy_json_path, self.legacy_json_path + ".migrated")
+            logger.info(f"Migrated {len(rows)} tracked players from {self.legacy_json_path}")
+        except Exception as e:
+            logger.error(f"Error migrating tracked players: {e}")
+
+    def _normalize_uids(self, conn: sqlite3.Connection):
+        """Rewrite UIDs stored before they were normalized, keeping the earliest row of any duplicates"""
+        seen = set()
+        duplicates = []
+        renames = []
+        for rowid, user_id, uid in conn.execute("SELECT rowid, user_id, uid FROM tracked_players ORDER BY rowid"):
+            canonical = normalize_uid(uid)
+            if (user_id, canonical) in seen:
+                duplicates.append((rowid,))
+                continue
+            seen.add((user_id, canonical))
+            if canonical != uid:
+                renames.append((canonical, rowid))
+        if not duplicates and not renames:
+            return
+
+        # Duplicates go first so no rename collides with the primary key
+        with conn:
+            conn.executemany("DELETE FROM tracked_players WHERE rowid = ?", duplicates)
+            conn.executemany("UPDATE tracked_players SET uid = ? WHERE rowid = ?", renames)
+        logger.info(f"Normalized {len(renames)} tracked UIDs, merged {len(duplicates)} duplicates")
+
+    def _load_user_sync(self, user_id: str) -> Dict[str, Dict]:
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT uid, data FROM tracked_players WHERE user_id = ? ORDER BY rowid", (user_id,)
+            ).fetchall()
+        return {uid: json_codec.loads(data) for uid, data in rows}
+
+    def _put_sync(self, user_id: str, uid: str, player: Dict):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO tracked_players (user_id, uid, region, data, guild_id) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (user_id, uid, player.get('region', 'IND'), json_codec.dumps(player), player.get('guild_id'))
+                )
+
+    def _remove_sync(self, user_id: str, uid: str) -> bool:
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                cursor = conn.execute(
+                    "DELETE FROM tracked_players WHERE user_id = ? AND uid = ?", (user_id, uid)
+                )
+        return cursor.rowcount > 0
+
+    def _page_sync(
+        self,
+        user_id: str,
+        after: Optional[int],
+        before: Optional[int],
+        limit: int
+    ) -> List[Tuple[int, str, str]]:
+        with self._lock:
+            conn = self._connect()
+            if before is not None:
+                rows = conn.execute(
+                    "SELECT rowid, uid, data FROM tracked_players WHERE user_id = ? AND rowid < ? "
+                    "ORDER BY rowid DESC LIMIT ?",
+                    (user_id, before, limit)
+                ).fetchall()
+                rows.reverse()
+                return rows
+            return conn.execute(
+                "SELECT rowid, uid, data FROM tracked_players WHERE user_id = ? AND rowid > ? "
+                "ORDER BY rowid LIMIT ?",
+                (user_id, after or 0, limit)
+            ).fetchall()
+
+    def _count_sync(self, user_id: str) -> int:
+        with self._lock:
+            conn = self._connect()
+            return conn.execute(
+                "SELECT COUNT(*) FROM tracked_players WHERE user_id = ?", (user_id,)
+            ).fetchone()[0]
+
+    def _all_pairs_sync(self) -> List[Tuple[str, str, str, Optional[str]]]:
+        with self._lock:
+            conn = self._connect()
+            return conn.execute("SELECT user_id, uid, region, guild_id FROM tracked_players").fetchall()
+
+    async def _ensure_index(self) -> SubscriberIndex:
+        """Build the subscriber index on first use"""
+        if not self._index_loaded:
+            async with self._index_lock:
+                if not self._index_loaded:
+                    self.index.rebuild(await asyncio.to_thread(self._all_pairs_sync))
+                    self._index_loaded = True
+                    logger.info(f"Indexed {len(self.index)} tracked UIDs")
+        return self.index
+
+    async def get_user(self, user_id: str) -> Dict[str, Dict]:
+        """Get a user's tracked players (uid -> data), loading them on first access"""
+        players = self._users.get(user_id)
+        if players is None:
+            players = await asyncio.to_thread(self._load_user_sync, user_id)
+            # Another task may have loaded (and modified) the user meanwhile
+            players = self._users.setdefault(user_id, players)
+        return players
+
+    async def get(self, user_id: str, uid: str) -> Optional[Dict]:
+        """Get one tracked player's data"""
+        return (await self.get_user(user_id)).get(uid)
+
+    async def put(self, user_id: str, uid: str, player: Dict):
+        """Add or replace a tracked player, committing just that row"""
+        index = await self._ensure_index()
+        players = await self.get_user(user_id)
+        await asyncio.to_thread(self._put_sync, user_id, uid, player)
+        players[uid] = player
+        index.add(user_id, uid)
+
+    async def remove(self, user_id: str, uid: str) -> Optional[Dict]:
+        """Stop tracking a player, returning its data if it was tracked"""
+        index = await self._ensure_index()
+        players = await self.get_user(user_id)
+        if uid not in players:
+            return None
+        await asyncio.to_thread(self._remove_sync, user_id, uid)
+        index.remove(user_id, uid)
+        return players.pop(uid)
+
+    async def page(
+        self,
+        user_id: str,
+        after: Optional[int] = None,
+        before: Optional[int] = None,
+        limit: int = 10
+    ) -> List[Tuple[int, str, Dict]]:
+        """
+        One page of a user's tracked players as (cursor, uid, data), oldest first
+
+        Keyset pagination on rowid: pass the last cursor of a page as `after`
+        for the next page, or the first cursor as `before` for the previous
+        one. Only the requested rows are read and decoded.
+        """
+        rows = await asyncio.to_thread(self._page_sync, user_id, after, before, limit)
+        return [(cursor, uid, json_codec.loads(data)) for cursor, uid, data in rows]
+
+    async def count(self, user_id: str) -> int:
+        """Number of players a user tracks"""
+        players = self._users.get(user_id)
+        if players is not None:
+            return len(players)
+        return await asyncio.to_thread(self._count_sync, user_id)
+
+    async def is_tracked(self, uid: str) -> bool:
+        """Check if any user tracks a UID"""
+        return (await self._ensure_index()).is_tracked(uid)
+
+    async def tracked_uids(self) -> List[str]:
+        """Distinct tracked UIDs across all users"""
+        return (await self._ensure_index()).uids()
+
+    async def all_pairs(self) -> List[Tuple[str, str, str, Optional[str]]]:
+        """Every tracked (user_id, uid, region, guild_id) without loading player data"""
+        return await asyncio.to_thread(self._all_pairs_sync)
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None